@@ -0,0 +1,47 @@
+"""unique natural key on supplies (warehouse, pile, unloading_date, coal_type, to_warehouse_ton)
+
+Revision ID: 3e6b8d1f4a27
+Revises: c7a8f2d5e931
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e6b8d1f4a27'
+down_revision: Union[str, Sequence[str], None] = 'c7a8f2d5e931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Повторные загрузки supplies.csv: оставляем первую (по supply_id) запись поставки
+    op.execute(
+        """
+        DELETE FROM supplies s
+        USING supplies t
+        WHERE s.warehouse_id = t.warehouse_id
+          AND s.pile_id = t.pile_id
+          AND s.unloading_date = t.unloading_date
+          AND s.coal_type = t.coal_type
+          AND s.to_warehouse_ton = t.to_warehouse_ton
+          AND s.supply_id > t.supply_id
+        """
+    )
+    op.drop_index('idx_supplies_composite', table_name='supplies')
+    op.create_unique_constraint(
+        'uq_supplies_natural_key',
+        'supplies',
+        ['warehouse_id', 'pile_id', 'unloading_date', 'coal_type', 'to_warehouse_ton'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_supplies_natural_key', 'supplies', type_='unique')
+    op.create_index('idx_supplies_composite', 'supplies', ['warehouse_id', 'pile_id', 'unloading_date'], unique=False)
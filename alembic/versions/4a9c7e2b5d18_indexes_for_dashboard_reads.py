@@ -0,0 +1,32 @@
+"""indexes for dashboard reads
+
+Revision ID: 4a9c7e2b5d18
+Revises: 8f2d4c6a1b93
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9c7e2b5d18'
+down_revision: Union[str, Sequence[str], None] = '8f2d4c6a1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_temperatures_pile_date', 'temperatures', ['pile_id', 'measurement_date'], unique=False)
+    op.create_index('idx_predictions_forecast_date', 'predictions', ['forecast_date', 'pile_id'], unique=False)
+    op.create_index('idx_fires_fire_start_date', 'fires', ['fire_start_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_fires_fire_start_date', table_name='fires')
+    op.drop_index('idx_predictions_forecast_date', table_name='predictions')
+    op.drop_index('idx_temperatures_pile_date', table_name='temperatures')
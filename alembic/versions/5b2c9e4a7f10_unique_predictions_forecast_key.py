@@ -0,0 +1,56 @@
+"""unique key on predictions (warehouse, pile, prediction_date, forecast_date, model_version)
+
+Revision ID: 5b2c9e4a7f10
+Revises: 1374510d9790
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2c9e4a7f10'
+down_revision: Union[str, Sequence[str], None] = '1374510d9790'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE predictions SET model_version = 'v1.0' WHERE model_version IS NULL")
+    # Оставляем только последний (по prediction_id) прогноз для каждого ключа
+    op.execute(
+        """
+        DELETE FROM predictions p
+        USING predictions q
+        WHERE p.warehouse_id = q.warehouse_id
+          AND p.pile_id = q.pile_id
+          AND p.prediction_date = q.prediction_date
+          AND p.forecast_date = q.forecast_date
+          AND p.model_version = q.model_version
+          AND p.prediction_id < q.prediction_id
+        """
+    )
+    op.alter_column('predictions', 'model_version',
+               existing_type=sa.String(length=20),
+               nullable=False,
+               server_default='v1.0')
+    op.drop_index('idx_predictions_composite', table_name='predictions')
+    op.create_unique_constraint(
+        'uq_predictions_forecast',
+        'predictions',
+        ['warehouse_id', 'pile_id', 'prediction_date', 'forecast_date', 'model_version'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_predictions_forecast', 'predictions', type_='unique')
+    op.create_index('idx_predictions_composite', 'predictions', ['warehouse_id', 'pile_id', 'prediction_date', 'forecast_date'], unique=False)
+    op.alter_column('predictions', 'model_version',
+               existing_type=sa.String(length=20),
+               nullable=True,
+               server_default=None)
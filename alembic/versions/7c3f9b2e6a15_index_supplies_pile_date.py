@@ -0,0 +1,28 @@
+"""index supplies (pile_id, unloading_date) for the first supply of each pile
+
+Revision ID: 7c3f9b2e6a15
+Revises: e2c6a9d4f817
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f9b2e6a15'
+down_revision: Union[str, Sequence[str], None] = 'e2c6a9d4f817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_supplies_pile_date', 'supplies', ['pile_id', 'unloading_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_supplies_pile_date', table_name='supplies')
@@ -0,0 +1,67 @@
+"""natural keys on temperatures and fires for idempotent uploads
+
+Revision ID: 8f2d4c6a1b93
+Revises: 3e6b8d1f4a27
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d4c6a1b93'
+down_revision: Union[str, Sequence[str], None] = '3e6b8d1f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дубли от повторных загрузок: оставляем последнюю загруженную запись ключа
+    op.execute(
+        """
+        DELETE FROM temperatures t
+        USING temperatures u
+        WHERE t.warehouse_id = u.warehouse_id
+          AND t.pile_id = u.pile_id
+          AND t.measurement_date = u.measurement_date
+          AND t.picket IS NOT DISTINCT FROM u.picket
+          AND t.shift IS NOT DISTINCT FROM u.shift
+          AND t.temperature_id < u.temperature_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM fires f
+        USING fires g
+        WHERE f.warehouse_id = g.warehouse_id
+          AND f.pile_id = g.pile_id
+          AND f.fire_start_date = g.fire_start_date
+          AND f.document_date = g.document_date
+          AND f.fire_id < g.fire_id
+        """
+    )
+    op.drop_index('idx_temperatures_composite', table_name='temperatures')
+    op.create_unique_constraint(
+        'uq_temperatures_natural_key',
+        'temperatures',
+        ['warehouse_id', 'pile_id', 'measurement_date', 'picket', 'shift'],
+        postgresql_nulls_not_distinct=True,
+    )
+    op.drop_index('idx_fires_composite', table_name='fires')
+    op.create_unique_constraint(
+        'uq_fires_natural_key',
+        'fires',
+        ['warehouse_id', 'pile_id', 'fire_start_date', 'document_date'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_fires_natural_key', 'fires', type_='unique')
+    op.create_index('idx_fires_composite', 'fires', ['warehouse_id', 'pile_id', 'fire_start_date'], unique=False)
+    op.drop_constraint('uq_temperatures_natural_key', 'temperatures', type_='unique')
+    op.create_index('idx_temperatures_composite', 'temperatures', ['warehouse_id', 'pile_id', 'measurement_date'], unique=False)
@@ -0,0 +1,30 @@
+"""indexes for stored forecast reads
+
+Revision ID: 9d41e3c0b2a6
+Revises: 5b2c9e4a7f10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41e3c0b2a6'
+down_revision: Union[str, Sequence[str], None] = '5b2c9e4a7f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_temperatures_measurement_date', 'temperatures', ['measurement_date'], unique=False)
+    op.create_index('idx_predictions_prediction_date', 'predictions', ['prediction_date', 'model_version', 'pile_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_predictions_prediction_date', table_name='predictions')
+    op.drop_index('idx_temperatures_measurement_date', table_name='temperatures')
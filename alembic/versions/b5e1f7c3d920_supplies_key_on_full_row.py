@@ -0,0 +1,36 @@
+"""supplies natural key stays on the full row (several deliveries per pile and day)
+
+Revision ID: b5e1f7c3d920
+Revises: 4a9c7e2b5d18
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1f7c3d920'
+down_revision: Union[str, Sequence[str], None] = '4a9c7e2b5d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ключ пересоздаётся на полной строке поставки (как в 3e6b8d1f4a27): в один день
+    # на штабель приходит несколько поставок разных марок, строки не удаляются
+    op.drop_constraint('uq_supplies_natural_key', 'supplies', type_='unique')
+    op.create_unique_constraint(
+        'uq_supplies_natural_key',
+        'supplies',
+        ['warehouse_id', 'pile_id', 'unloading_date', 'coal_type', 'to_warehouse_ton'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # До этой ревизии ключ тот же — менять нечего
+    pass
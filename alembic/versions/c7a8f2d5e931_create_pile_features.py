@@ -0,0 +1,55 @@
+"""create pile_features
+
+Revision ID: c7a8f2d5e931
+Revises: 9d41e3c0b2a6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a8f2d5e931'
+down_revision: Union[str, Sequence[str], None] = '9d41e3c0b2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pile_features',
+    sa.Column('pile_feature_id', sa.Integer(), nullable=False),
+    sa.Column('pile_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('coal_type', sa.String(length=50), nullable=False),
+    sa.Column('pile_formation_date', sa.Date(), nullable=False),
+    sa.Column('initial_volume_tonnes', sa.Float(), nullable=False),
+    sa.Column('days_in_storage', sa.Integer(), nullable=False),
+    sa.Column('temperature_p', sa.Float(), nullable=False),
+    sa.Column('temp_trend_7d', sa.Float(), nullable=False),
+    sa.Column('temp_avg_7d', sa.Float(), nullable=False),
+    sa.Column('temp_max_7d', sa.Float(), nullable=False),
+    sa.Column('days_since_last_fire', sa.Integer(), nullable=False),
+    sa.Column('fire_history_count', sa.Integer(), nullable=False),
+    sa.Column('weather_temp_avg', sa.Float(), nullable=False),
+    sa.Column('weather_humidity', sa.Float(), nullable=False),
+    sa.Column('season', sa.Integer(), nullable=False),
+    sa.Column('month_sin', sa.Float(), nullable=False),
+    sa.Column('month_cos', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('pile_feature_id'),
+    sa.UniqueConstraint('pile_id', 'date', name='uq_pile_features_pile_date')
+    )
+    op.create_index('idx_pile_features_date', 'pile_features', ['date'], unique=False)
+    op.create_index(op.f('ix_pile_features_pile_feature_id'), 'pile_features', ['pile_feature_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pile_features_pile_feature_id'), table_name='pile_features')
+    op.drop_index('idx_pile_features_date', table_name='pile_features')
+    op.drop_table('pile_features')
@@ -0,0 +1,36 @@
+"""indexes for data version (latest write per table)
+
+Revision ID: e2c6a9d4f817
+Revises: b5e1f7c3d920
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6a9d4f817'
+down_revision: Union[str, Sequence[str], None] = 'b5e1f7c3d920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_supplies_loaded_at', 'supplies', ['loaded_at'], unique=False)
+    op.create_index('idx_temperatures_loaded_at', 'temperatures', ['loaded_at'], unique=False)
+    op.create_index('idx_fires_loaded_at', 'fires', ['loaded_at'], unique=False)
+    op.create_index('idx_weather_loaded_at', 'weather', ['loaded_at'], unique=False)
+    op.create_index('idx_predictions_created_at', 'predictions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_predictions_created_at', table_name='predictions')
+    op.drop_index('idx_weather_loaded_at', table_name='weather')
+    op.drop_index('idx_fires_loaded_at', table_name='fires')
+    op.drop_index('idx_temperatures_loaded_at', table_name='temperatures')
+    op.drop_index('idx_supplies_loaded_at', table_name='supplies')
@@ -1,19 +1,187 @@
+import math
+import time
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from loguru import logger
 
-from app.domain.entities import RiskForecast, Prediction, CoalPile
+from app.domain.entities import (
+    RiskForecast,
+    Prediction,
+    CoalPile,
+    TemperatureReading,
+    WeatherData,
+    PileFeatures,
+)
 from app.domain.interfaces import (
     CoalPileRepository,
     TemperatureRepository,
     FireIncidentRepository,
     WeatherRepository,
     PredictionRepository,
+    PileFeatureRepository,
     MLService,
 )
 
 
+def build_pile_features(
+    pile: CoalPile,
+    forecast_date: date,
+    latest_temp: TemperatureReading,
+    temps_7d: List[TemperatureReading],
+    last_fire_date: Optional[date],
+    fire_history_count: int,
+    weather: WeatherData,
+) -> dict:
+    """Собирает признаки в формате Приложения A контракта с дата-сайентистом."""
+    # Дни в хранилище
+    days_in_storage = (forecast_date - pile.formation_date).days
+
+    # Температурные признаки за 7 дней
+    if len(temps_7d) < 2:
+        temp_trend_7d = 0.0
+    else:
+        # Упрощённый расчёт тренда через разницу последней и первой
+        temp_trend_7d = float(temps_7d[-1].temperature - temps_7d[0].temperature)
+
+    temp_avg_7d = sum(t.temperature for t in temps_7d) / len(temps_7d) if temps_7d else latest_temp.temperature
+    temp_max_7d = max(t.temperature for t in temps_7d) if temps_7d else latest_temp.temperature
+
+    # История пожаров
+    if last_fire_date is None:
+        days_since_last_fire = -1
+        fire_history_count = 0
+    else:
+        days_since_last_fire = (forecast_date - last_fire_date).days
+
+    # Сезонные признаки
+    month = forecast_date.month
+    if month in (3, 4, 5):
+        season = 1
+    elif month in (6, 7, 8):
+        season = 2
+    elif month in (9, 10, 11):
+        season = 3
+    else:
+        season = 4
+
+    month_sin = math.sin(2 * math.pi * month / 12)
+    month_cos = math.cos(2 * math.pi * month / 12)
+
+    return {
+        "pile_id": pile.pile_id,
+        "coal_type": pile.coal_type,
+        "pile_formation_date": pile.formation_date.isoformat(),
+        "initial_volume_tonnes": pile.initial_volume_tonnes,
+        "days_in_storage": days_in_storage,
+        "temperature_p": latest_temp.temperature,
+        "temp_trend_7d": temp_trend_7d,
+        "temp_avg_7d": temp_avg_7d,
+        "temp_max_7d": temp_max_7d,
+        "days_since_last_fire": days_since_last_fire,
+        "fire_history_count": fire_history_count,
+        "weather_temp_avg": weather.air_temperature,
+        "weather_humidity": weather.humidity,
+        "season": season,
+        "month_sin": month_sin,
+        "month_cos": month_cos,
+    }
+
+
+def iter_range_features(
+    piles: List[CoalPile],
+    temp_repo: TemperatureRepository,
+    fire_repo: FireIncidentRepository,
+    weather_repo: WeatherRepository,
+    start_date: date,
+    end_date: date,
+) -> Iterator[Tuple[CoalPile, date, dict]]:
+    """
+    Признаки (штабель, день) за диапазон дат на момент каждого дня.
+    Ряды температур, пожаров и погоды читаются один раз на весь диапазон,
+    скользящие 7- и 365-дневные окна считаются в памяти через bisect.
+    Дни без погоды и без единого замера к этому дню пропускаются.
+    """
+    ids = [p.pile_id for p in piles]
+    window_start = start_date - timedelta(days=7)
+    temps_by_pile = temp_repo.get_by_pile_ids_and_date_range(ids, window_start, end_date)
+    latest_before = temp_repo.get_latest_by_pile_ids(ids, as_of=window_start - timedelta(days=1))
+    fires = fire_repo.get_fires_in_date_range(date.min, end_date)
+    weather_by_date = {w.date: w for w in weather_repo.get_by_date_range(start_date, end_date)}
+
+    all_fire_dates = sorted(f.actual_date for f in fires)
+    fire_dates_by_pile: Dict[int, List[date]] = {}
+    for f in fires:
+        fire_dates_by_pile.setdefault(f.pile_id, []).append(f.actual_date)
+    for dates in fire_dates_by_pile.values():
+        dates.sort()
+
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    for pile in piles:
+        readings = temps_by_pile.get(pile.pile_id, [])
+        reading_dates = [r.measurement_date for r in readings]
+        pile_fire_dates = fire_dates_by_pile.get(pile.pile_id, [])
+
+        for day in days:
+            weather = weather_by_date.get(day)
+            if weather is None:
+                continue
+            hi = bisect_right(reading_dates, day)
+            latest_temp: Optional[TemperatureReading] = (
+                readings[hi - 1] if hi else latest_before.get(pile.pile_id)
+            )
+            if latest_temp is None:
+                continue
+            lo = bisect_left(reading_dates, day - timedelta(days=7))
+
+            fires_up_to_day = bisect_right(pile_fire_dates, day)
+            last_fire_date = pile_fire_dates[fires_up_to_day - 1] if fires_up_to_day else None
+            fire_history_count = bisect_right(all_fire_dates, day) - bisect_left(
+                all_fire_dates, day - timedelta(days=365)
+            )
+
+            features = build_pile_features(
+                pile=pile,
+                forecast_date=day,
+                latest_temp=latest_temp,
+                temps_7d=readings[lo:hi],
+                last_fire_date=last_fire_date,
+                fire_history_count=fire_history_count,
+                weather=weather,
+            )
+            yield pile, day, features
+
+
+def feature_row_to_dict(row: PileFeatures) -> dict:
+    """Строка таблицы `pile_features` → словарь признаков Приложения A."""
+    features = row.model_dump(exclude={"date", "warehouse_id"})
+    features["pile_formation_date"] = row.pile_formation_date.isoformat()
+    return features
+
+
+def convert_to_predictions(
+    ml_result: dict, warehouse_id: int, forecast_date: date, model_version: str
+) -> List[Prediction]:
+    """Преобразует результат ML в список Prediction для сохранения в БД."""
+    predictions = []
+    for i in range(1, 4):
+        day_key = f"day_{i}"
+        pred_date = forecast_date + timedelta(days=i - 1)
+        predictions.append(
+            Prediction(
+                pile_id=ml_result["pile_id"],
+                warehouse_id=warehouse_id,
+                prediction_date=forecast_date,
+                forecast_date=pred_date,
+                risk_level=ml_result["risk_levels"][day_key],
+                probability=ml_result["probabilities"][day_key],
+                model_version=model_version,
+            )
+        )
+    return predictions
+
+
 class CalculateFireRisk:
     """
     Use Case для расчёта прогноза риска самовозгорания.
@@ -28,149 +196,244 @@ class CalculateFireRisk:
         weather_repo: WeatherRepository,
         prediction_repo: PredictionRepository,
         ml_service: MLService,
+        feature_repo: Optional[PileFeatureRepository] = None,
     ):
         self.pile_repo = pile_repo
         self.temp_repo = temp_repo
         self.fire_repo = fire_repo
         self.weather_repo = weather_repo
         self.prediction_repo = prediction_repo
+        self.feature_repo = feature_repo
         self.ml_service = ml_service
+        self.last_run_stats: dict = {}
 
-    def execute(self, forecast_date: date = None) -> List[RiskForecast]:
+    def execute(
+        self,
+        forecast_date: date = None,
+        pile_ids: Optional[List[int]] = None,
+        only_changed: bool = False,
+    ) -> List[RiskForecast]:
+        """
+        Считает и сохраняет прогноз. Если передан pile_ids — только для этих штабелей:
+        фильтр уходит в запросы к репозиториям и в вызов модели.
+        only_changed=True — пересчитываются только штабели, у которых после
+        сохранённого прогноза на эту дату появились новые данные.
+        """
+        started = time.perf_counter()
+        piles = self.pile_repo.get_all_active(pile_ids=pile_ids)
         if forecast_date is None:
-            # Получаем последнюю дату замера температуры среди всех штабелей
-            piles = self.pile_repo.get_all_active()
             if not piles:
                 raise ValueError("Нет активных штабелей")
-            latest_dates = []
-            for pile in piles:
-                temp = self.temp_repo.get_latest_by_pile_id(pile.pile_id)
-                if temp:
-                    latest_dates.append(temp.measurement_date)
-            if not latest_dates:
-                raise ValueError("Нет данных о температуре — невозможно сделать прогноз")
-            forecast_date = max(latest_dates)  # самая свежая дата из всех штабелей
-
-        piles = self.pile_repo.get_all_active()
+            forecast_date = self._resolve_forecast_date()
+
+        piles_total = len(piles)
+        if only_changed:
+            piles = self._select_changed_piles(piles, forecast_date)
+
         forecasts = []
+        predictions = []
+        for pile, ml_result in self._score(piles, forecast_date):
+            predictions.extend(
+                convert_to_predictions(
+                    ml_result, pile.warehouse_id, forecast_date, self.ml_service.model_version
+                )
+            )
+            forecasts.append(
+                RiskForecast(
+                    pile_id=ml_result["pile_id"],
+                    forecast_date=forecast_date,
+                    risk_levels=ml_result["risk_levels"],
+                    probabilities=ml_result["probabilities"],
+                )
+            )
 
+        # Весь прогноз запуска сохраняется одной транзакцией
+        save_started = time.perf_counter()
+        rows_written = self.prediction_repo.save_batch(predictions)
+        finished = time.perf_counter()
+
+        self.last_run_stats = {
+            "forecast_date": forecast_date.isoformat(),
+            "piles_total": piles_total,
+            "piles_skipped": piles_total - len(piles),
+            "piles_scored": len(forecasts),
+            "rows_written": rows_written,
+            "save_seconds": round(finished - save_started, 4),
+            "elapsed_seconds": round(finished - started, 4),
+        }
+        logger.info(
+            f"Прогноз на {forecast_date}: {len(forecasts)} штабелей, "
+            f"записано {rows_written} строк за {finished - save_started:.3f} с "
+            f"(всего {finished - started:.3f} с)"
+        )
+        return forecasts
+
+    def get_forecasts(
+        self,
+        forecast_date: date = None,
+        pile_ids: Optional[List[int]] = None,
+        refresh: bool = False,
+    ) -> List[RiskForecast]:
+        """
+        Прогноз для чтения: только сохранённые прогнозы на дату, без вызова модели
+        и записи в БД. Штабели без прогноза или с входными данными, загруженными
+        позже него (как в execute(only_changed=True)), попадают в last_run_stats:
+        piles_pending — их число, recompute_needed — досчитает ли их фоновый
+        пересчёт (он считает последнюю дату замеров). refresh=True — полный пересчёт.
+        """
+        if forecast_date is None:
+            forecast_date = self._resolve_forecast_date()
+        if refresh:
+            return self.execute(forecast_date=forecast_date, pile_ids=pile_ids)
+
+        stored = self.get_stored_forecasts(forecast_date, pile_ids=pile_ids)
+        stored_ids = {f.pile_id for f in stored}
+        piles = self.pile_repo.get_all_active(pile_ids=pile_ids)
+        stale = {p.pile_id for p in self._select_changed_piles(piles, forecast_date)}
+        pending = [p.pile_id for p in piles if p.pile_id in stale or p.pile_id not in stored_ids]
+
+        self.last_run_stats = {
+            "forecast_date": forecast_date.isoformat(),
+            "piles_total": len(piles),
+            "piles_served": len(stored),
+            "piles_pending": len(pending),
+            "recompute_needed": bool(pending)
+            and forecast_date == self.temp_repo.get_latest_measurement_date(),
+        }
+        return stored
+
+    def get_stored_forecasts(
+        self, forecast_date: date, pile_ids: Optional[List[int]] = None
+    ) -> List[RiskForecast]:
+        """Сохранённые прогнозы на дату текущей версией модели (одно чтение по индексу)."""
+        predictions = self.prediction_repo.get_by_prediction_date(
+            forecast_date, self.ml_service.model_version, pile_ids=pile_ids
+        )
+        return self._predictions_to_forecasts(predictions, forecast_date)
+
+    def _select_changed_piles(self, piles: List[CoalPile], forecast_date: date) -> List[CoalPile]:
+        """
+        Оставляет штабели, чьи входные данные загружены позже сохранённого прогноза
+        на forecast_date (по loaded_at). Погода за дату и пожары (история пожаров
+        считается по всему складу) делают устаревшими все штабели сразу.
+        """
+        pile_ids = [p.pile_id for p in piles]
+        forecast_times = self.prediction_repo.get_created_at_by_pile_ids(
+            forecast_date, self.ml_service.model_version, pile_ids
+        )
+        if not forecast_times:
+            return piles
+
+        global_loaded = [
+            self.weather_repo.get_loaded_at(forecast_date),
+            self.fire_repo.get_last_loaded_at(),
+        ]
+        temps_loaded = self.temp_repo.get_last_loaded_at_by_pile_ids(pile_ids)
+        supplies_loaded = self.pile_repo.get_last_loaded_at_by_pile_ids(pile_ids)
+
+        changed = []
         for pile in piles:
-            features = self._build_pile_features(pile, forecast_date)
-            if not features:
+            forecast_at = forecast_times.get(pile.pile_id)
+            if forecast_at is None:
+                changed.append(pile)
                 continue
+            loaded = global_loaded + [
+                temps_loaded.get(pile.pile_id),
+                supplies_loaded.get(pile.pile_id),
+            ]
+            if any(ts is not None and ts > forecast_at for ts in loaded):
+                changed.append(pile)
+        return changed
 
-            try:
-                ml_result = self.ml_service.predict_risk(features)
-            except Exception:
-                continue
+    def _resolve_forecast_date(self) -> date:
+        """Последняя дата замера температуры среди всех штабелей."""
+        latest_date = self.temp_repo.get_latest_measurement_date()
+        if latest_date is None:
+            raise ValueError("Нет данных о температуре — невозможно сделать прогноз")
+        return latest_date
 
-            predictions = self._convert_to_predictions(ml_result, pile.warehouse_id, forecast_date)
-            self.prediction_repo.save_batch(predictions)
+    def _score(self, piles: List[CoalPile], forecast_date: date) -> List[Tuple[CoalPile, dict]]:
+        """Строит признаки и прогноз для штабелей одним пакетным вызовом модели."""
+        scored = self._build_features(piles, forecast_date)
+        if not scored:
+            return []
+        try:
+            ml_results = self.ml_service.predict_risk_batch([features for _, features in scored])
+        except Exception:
+            logger.exception("Ошибка пакетного прогноза — прогноз не построен")
+            return []
 
-            risk_forecast = RiskForecast(
-                pile_id=ml_result["pile_id"],
-                forecast_date=forecast_date,
-                risk_levels=ml_result["risk_levels"],
-                probabilities=ml_result["probabilities"],
-            )
-            forecasts.append(risk_forecast)
+        return [
+            (pile, ml_result)
+            for (pile, _), ml_result in zip(scored, ml_results)
+            if ml_result is not None
+        ]
 
-        return forecasts
+    def _build_features(
+        self, piles: List[CoalPile], forecast_date: date
+    ) -> List[Tuple[CoalPile, dict]]:
+        """
+        Берёт готовые признаки из таблицы `pile_features` одним запросом;
+        для штабелей, которых там нет, собирает признаки из исходных таблиц.
+        """
+        if not piles or self.feature_repo is None:
+            return self._collect_features(piles, forecast_date)
 
-    def _build_pile_features(self, pile: CoalPile, forecast_date: date) -> dict | None:
-        """Собирает признаки в формате Приложения A контракта с дата-сайентистом."""
-        # Дни в хранилище
-        days_in_storage = (forecast_date - pile.formation_date).days
+        stored = {
+            row.pile_id: row
+            for row in self.feature_repo.get_by_date(forecast_date, [p.pile_id for p in piles])
+        }
+        result = [
+            (pile, feature_row_to_dict(stored[pile.pile_id]))
+            for pile in piles
+            if pile.pile_id in stored
+        ]
+        missing = [pile for pile in piles if pile.pile_id not in stored]
+        if missing:
+            logger.debug(f"Нет сохранённых признаков на {forecast_date} для {len(missing)} штабелей")
+            result.extend(self._collect_features(missing, forecast_date))
+        return result
 
-        # Последняя температура
-        latest_temp = self.temp_repo.get_latest_by_pile_id(pile.pile_id)
-        if not latest_temp:
-            return None
+    def _collect_features(
+        self, piles: List[CoalPile], forecast_date: date
+    ) -> List[Tuple[CoalPile, dict]]:
+        """
+        Собирает признаки из исходных таблиц на момент forecast_date — тем же
+        iter_range_features, которым заполняется `pile_features`, поэтому результат
+        не зависит от того, есть ли для штабеля сохранённая строка.
+        """
+        if not piles:
+            return []
 
-        # Температурные признаки за 7 дней
-        start_7d = forecast_date - timedelta(days=7)
-        temps_7d = self.temp_repo.get_by_pile_id_and_date_range(
-            pile.pile_id, start_7d, forecast_date
-        )
-        if len(temps_7d) < 2:
-            temp_trend_7d = 0.0
-        else:
-            # Упрощённый расчёт тренда через разницу последней и первой
-            temp_trend_7d = float(temps_7d[-1].temperature - temps_7d[0].temperature)
-
-        temp_avg_7d = sum(t.temperature for t in temps_7d) / len(temps_7d) if temps_7d else latest_temp.temperature
-        temp_max_7d = max(t.temperature for t in temps_7d) if temps_7d else latest_temp.temperature
-
-        # История пожаров
-        last_fire_date = self.fire_repo.get_last_fire_date_by_pile_id(pile.pile_id)
-        if last_fire_date is None:
-            days_since_last_fire = -1
-            fire_history_count = 0
-        else:
-            days_since_last_fire = (forecast_date - last_fire_date).days
-            # Пожары за последний год
-            start_year = forecast_date - timedelta(days=365)
-            fires_last_year = self.fire_repo.get_fires_in_date_range(start_year, forecast_date)
-            fire_history_count = len(fires_last_year)
-
-        # Погода
-        weather = self.weather_repo.get_by_date(forecast_date)
-        if not weather:
-            logger.warning(f"Нет погоды на дату {forecast_date} для штабеля {pile.pile_id}")
-            return None
-        if not latest_temp:
-            logger.warning(f"Нет температуры для штабеля {pile.pile_id}")
-            return None
-
-        # Сезонные признаки
-        month = forecast_date.month
-        if month in (3, 4, 5):
-            season = 1
-        elif month in (6, 7, 8):
-            season = 2
-        elif month in (9, 10, 11):
-            season = 3
-        else:
-            season = 4
-
-        import math
-        month_sin = math.sin(2 * math.pi * month / 12)
-        month_cos = math.cos(2 * math.pi * month / 12)
-
-        return {
-            "pile_id": pile.pile_id,
-            "coal_type": pile.coal_type,
-            "pile_formation_date": pile.formation_date.isoformat(),
-            "initial_volume_tonnes": pile.initial_volume_tonnes,
-            "days_in_storage": days_in_storage,
-            "temperature_p": latest_temp.temperature,
-            "temp_trend_7d": temp_trend_7d,
-            "temp_avg_7d": temp_avg_7d,
-            "temp_max_7d": temp_max_7d,
-            "days_since_last_fire": days_since_last_fire,
-            "fire_history_count": fire_history_count,
-            "weather_temp_avg": weather.air_temperature,
-            "weather_humidity": weather.humidity,
-            "season": season,
-            "month_sin": month_sin,
-            "month_cos": month_cos,
-        }
+        result = [
+            (pile, features)
+            for pile, _, features in iter_range_features(
+                piles, self.temp_repo, self.fire_repo, self.weather_repo, forecast_date, forecast_date
+            )
+        ]
+        if not result:
+            logger.warning(f"Нет погоды или замеров на дату {forecast_date} — прогноз не строится")
+        return result
 
+    def _predictions_to_forecasts(
+        self, predictions: List[Prediction], forecast_date: date
+    ) -> List[RiskForecast]:
+        """Собирает строки таблицы predictions обратно в прогнозы формата Приложения B."""
+        by_pile: Dict[int, Dict[str, Prediction]] = {}
+        for p in predictions:
+            day_key = f"day_{(p.forecast_date - forecast_date).days + 1}"
+            by_pile.setdefault(p.pile_id, {})[day_key] = p
 
-    def _convert_to_predictions(self, ml_result: dict, warehouse_id: int, forecast_date: date) -> List[Prediction]:
-        """Преобразует результат ML в список Prediction для сохранения в БД."""
-        predictions = []
-        for i in range(1, 4):
-            day_key = f"day_{i}"
-            pred_date = forecast_date + timedelta(days=i - 1)
-            predictions.append(
-                Prediction(
-                    pile_id=ml_result["pile_id"],
-                    warehouse_id=warehouse_id,
-                    prediction_date=forecast_date,
-                    forecast_date=pred_date,
-                    risk_level=ml_result["risk_levels"][day_key],
-                    probability=ml_result["probabilities"][day_key],
+        forecasts = []
+        for pile_id, days in by_pile.items():
+            if any(f"day_{i}" not in days for i in range(1, 4)):
+                continue  # неполный прогноз считаем отсутствующим
+            forecasts.append(
+                RiskForecast(
+                    pile_id=pile_id,
+                    forecast_date=forecast_date,
+                    risk_levels={k: days[k].risk_level for k in ("day_1", "day_2", "day_3")},
+                    probabilities={k: float(days[k].probability) for k in ("day_1", "day_2", "day_3")},
                 )
             )
-        return predictions
\ No newline at end of file
+        return forecasts
@@ -1,70 +1,86 @@
+import base64
+import binascii
+import json
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import Any, List, Optional
 
-from app.domain.entities import CoalPile, TemperatureReading, Prediction
-from app.domain.interfaces import (
-    CoalPileRepository,
-    TemperatureRepository,
-    PredictionRepository,
-    FireIncidentRepository,
-    WeatherRepository,
-)
+from app.domain.entities import DashboardPile, DashboardQuery
+from app.domain.interfaces import DashboardReadModel, WeatherRepository
+
+
+def encode_cursor(sort: str, value: Any, pile_id: int) -> str:
+    """Непрозрачный курсор страницы: поле сортировки и ключ последней строки."""
+    raw = json.dumps({"sort": sort, "value": value, "pile_id": pile_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, pile_id = data["value"], int(data["pile_id"])
+        if data["sort"] != sort:
+            raise ValueError("курсор получен при другой сортировке")
+        if sort.lstrip("-") == "formation_date":
+            value = date.fromisoformat(value)
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as e:
+        raise ValueError(f"Неверный курсор страницы: {e}")
+    return value, pile_id
 
 
 class GetDashboardData:
     """
     Use Case для сбора данных главного экрана (Dashboard).
+    Все данные читаются фиксированным числом запросов, независимо от числа штабелей.
     """
 
     def __init__(
         self,
-        pile_repo: CoalPileRepository,
-        temp_repo: TemperatureRepository,
-        pred_repo: PredictionRepository,
-        fire_repo: FireIncidentRepository,
+        read_model: DashboardReadModel,
         weather_repo: WeatherRepository,
     ):
-        self.pile_repo = pile_repo
-        self.temp_repo = temp_repo
-        self.pred_repo = pred_repo
-        self.fire_repo = fire_repo
+        self.read_model = read_model
         self.weather_repo = weather_repo
 
-    def execute(self, forecast_date: date = None) -> dict:
+    def execute(
+        self,
+        forecast_date: date = None,
+        query: Optional[DashboardQuery] = None,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        """
+        query — фильтры, сортировка и размер страницы (всё применяется в БД);
+        cursor — next_cursor предыдущей страницы.
+        """
         if forecast_date is None:
             forecast_date = date.today()
+        query = query or DashboardQuery()
+        if cursor is not None:
+            query = query.model_copy(update={"after": decode_cursor(cursor, query.sort)})
 
-        # 1. Все активные штабели
-        piles = self.pile_repo.get_all_active()
-        piles_data = []
-
-        for pile in piles:
-            # Последняя температура
-            latest_temp = self.temp_repo.get_latest_by_pile_id(pile.pile_id)
-            if not latest_temp:
-                continue
-
-            # Прогнозы на 3 дня (base_date = forecast_date)
-            pred_dates = [forecast_date, forecast_date + timedelta(days=1), forecast_date + timedelta(days=2)]
-            predictions = self.pred_repo.get_by_pile_id_and_forecast_dates(pile.pile_id, pred_dates)
-
-            # Формируем risk_forecast: {"2025-11-23": "low", ...}
-            risk_forecast = {}
-            for i, d in enumerate(pred_dates):
-                day_key = f"day_{i+1}"
-                # Ищем прогноз на эту дату
-                pred = next((p for p in predictions if p.forecast_date == d), None)
-                risk_level = pred.risk_level if pred else "low"
-                risk_forecast[d.isoformat()] = risk_level
-
-            piles_data.append({
+        # 1. Активные штабели с последней температурой и прогнозами на 3 дня (base_date = forecast_date)
+        pred_dates = [forecast_date, forecast_date + timedelta(days=1), forecast_date + timedelta(days=2)]
+        next_cursor = None
+        if query.limit is None:
+            piles = self.read_model.get_piles(pred_dates, query)
+        else:
+            # Лишняя строка показывает, есть ли следующая страница
+            piles = self.read_model.get_piles(pred_dates, query.model_copy(update={"limit": query.limit + 1}))
+            if len(piles) > query.limit:
+                piles = piles[: query.limit]
+                next_cursor = self._cursor(query.sort, piles[-1], pred_dates)
+        piles_data = [
+            {
                 "pile_id": pile.pile_id,
+                "warehouse_id": pile.warehouse_id,
                 "coal_type": pile.coal_type,
                 "formation_date": pile.formation_date.isoformat(),
                 "days_in_storage": (forecast_date - pile.formation_date).days,
-                "last_temp": float(latest_temp.temperature),
-                "risk_forecast": risk_forecast,
-            })
+                "last_temp": pile.last_temp,
+                # Формируем risk_forecast: {"2025-11-23": "low", ...}
+                "risk_forecast": {d.isoformat(): pile.risk_levels.get(d, "low") for d in pred_dates},
+            }
+            for pile in piles
+        ]
 
         # 2. Сводка по погоде на сегодня
         weather = self.weather_repo.get_by_date(forecast_date)
@@ -74,7 +90,7 @@ class GetDashboardData:
         }
 
         # 3. Дни без пожаров
-        last_fire = self._get_last_fire_date()
+        last_fire = self.read_model.get_last_fire_date()
         if last_fire:
             days_without_fire = (forecast_date - last_fire).days
         else:
@@ -82,17 +98,18 @@ class GetDashboardData:
 
         return {
             "piles": piles_data,
+            "next_cursor": next_cursor,
             "weather_summary": weather_summary,
             "days_without_fire": days_without_fire,
             "last_update": datetime.utcnow().isoformat() + "Z",
         }
 
-    def _get_last_fire_date(self) -> date | None:
-        """Получает дату последнего пожара во всей БД."""
-        piles = self.pile_repo.get_all_active()
-        last_dates = []
-        for pile in piles:
-            d = self.fire_repo.get_last_fire_date_by_pile_id(pile.pile_id)
-            if d:
-                last_dates.append(d)
-        return max(last_dates) if last_dates else None
\ No newline at end of file
+    @staticmethod
+    def _cursor(sort: str, pile: DashboardPile, pred_dates: List[date]) -> str:
+        value = {
+            "pile_id": pile.pile_id,
+            "last_temp": pile.last_temp,
+            "risk": pile.risk_rank(pred_dates),
+            "formation_date": pile.formation_date.isoformat(),
+        }[sort.lstrip("-")]
+        return encode_cursor(sort, value, pile.pile_id)
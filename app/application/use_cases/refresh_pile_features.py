@@ -0,0 +1,84 @@
+import time
+from datetime import date
+from typing import List, Optional
+
+from loguru import logger
+
+from app.application.use_cases.calculate_fire_risk import iter_range_features
+from app.domain.entities import CoalPile, PileFeatures
+from app.domain.interfaces import (
+    CoalPileRepository,
+    TemperatureRepository,
+    FireIncidentRepository,
+    WeatherRepository,
+    PileFeatureRepository,
+)
+
+
+def to_pile_features(pile: CoalPile, day: date, features: dict) -> PileFeatures:
+    """Словарь признаков Приложения A → строка таблицы `pile_features`."""
+    return PileFeatures(date=day, warehouse_id=pile.warehouse_id, **features)
+
+
+class RefreshPileFeatures:
+    """
+    Use Case для поддержки таблицы `pile_features` в актуальном состоянии.
+    Вызывается после загрузки данных и пересчитывает только затронутые
+    штабели и дни, записывая результат пакетными upsert-ами.
+    """
+
+    def __init__(
+        self,
+        pile_repo: CoalPileRepository,
+        temp_repo: TemperatureRepository,
+        fire_repo: FireIncidentRepository,
+        weather_repo: WeatherRepository,
+        feature_repo: PileFeatureRepository,
+        batch_size: int = 5000,
+    ):
+        self.pile_repo = pile_repo
+        self.temp_repo = temp_repo
+        self.fire_repo = fire_repo
+        self.weather_repo = weather_repo
+        self.feature_repo = feature_repo
+        self.batch_size = batch_size
+
+    def execute(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        pile_ids: Optional[List[int]] = None,
+    ) -> int:
+        """
+        Пересчитывает признаки за [start_date, end_date] для указанных штабелей
+        (по умолчанию — для всех). Диапазон ограничен последней датой замеров:
+        дальше прогноз не строится. Возвращает число записанных строк.
+        """
+        started = time.perf_counter()
+        latest_measurement = self.temp_repo.get_latest_measurement_date()
+        if latest_measurement is None:
+            return 0
+        end_date = min(end_date, latest_measurement) if end_date else latest_measurement
+        if start_date > end_date:
+            return 0
+
+        piles = self.pile_repo.get_all_active(pile_ids=pile_ids)
+        if not piles:
+            return 0
+
+        written = 0
+        batch: List[PileFeatures] = []
+        for pile, day, features in iter_range_features(
+            piles, self.temp_repo, self.fire_repo, self.weather_repo, start_date, end_date
+        ):
+            batch.append(to_pile_features(pile, day, features))
+            if len(batch) >= self.batch_size:
+                written += self.feature_repo.save_batch(batch)
+                batch = []
+        written += self.feature_repo.save_batch(batch)
+
+        logger.info(
+            f"Признаки штабелей обновлены за {start_date}..{end_date}: {len(piles)} штабелей, "
+            f"{written} строк за {time.perf_counter() - started:.2f} с"
+        )
+        return written
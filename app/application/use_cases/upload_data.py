@@ -1,14 +1,40 @@
 import csv
-from datetime import datetime, date
+import gzip
+import importlib.util
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from datetime import date
+from functools import partial
 from io import TextIOWrapper
-from typing import List
+from itertools import islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+import numpy as np
+import pandas as pd
 from loguru import logger
 
+from app.application.use_cases.refresh_pile_features import RefreshPileFeatures
 from app.domain.entities import (
-    TemperatureReading,
-    FireIncident,
-    CoalPile,
+    BundleReport,
+    IngestReport,
     WeatherData,
 )
 from app.domain.interfaces import (
@@ -16,12 +42,383 @@ from app.domain.interfaces import (
     FireIncidentRepository,
     CoalPileRepository,
     WeatherRepository,
+    UnitOfWork,
 )
 
+T = TypeVar("T")
+
+# Колонки weather.csv, участвующие в суточных агрегатах
+WEATHER_COLUMNS = ("date", "t", "humidity", "p", "v_avg", "v_max", "precipitation")
+WEATHER_CHUNK_ROWS = 100_000
+# Размер куска CSV для поколоночной проверки остальных типов
+CSV_CHUNK_ROWS = 50_000
+
+# Обязательные колонки выгрузок (в Parquet/Arrow — те же имена, что в CSV)
+SUPPLIES_COLUMNS = ("ВыгрузкаНаСклад", "Штабель", "Наим. ЕТСНГ", "На склад, тн", "Склад")
+TEMPERATURE_COLUMNS = ("Дата акта", "Штабель", "Склад", "Максимальная температура")
+FIRE_COLUMNS = ("Дата составления", "Дата начала", "Штабель", "Склад", "Вес по акту, тн")
+
+# Колоночные форматы загрузки (читаются через pyarrow)
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Форматы и сжатие файлов по расширению: temperature.csv.gz, fires.parquet, sync.zip, ...
+FORMAT_EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".feather": "arrow",
+    ".zip": "zip",
+}
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+# Порядок загрузки типов из архива: акты о пожарах берут марку угля из поставок
+BUNDLE_ORDER = ("supplies", "temperature", "fires", "weather")
+
+
+def _row_values(row: pd.Series) -> dict:
+    """Значения строки для примера в отчёте: пропуски — None, numpy-скаляры — числа Python."""
+    return {
+        column: None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+        for column, value in row.items()
+    }
+
+
+def _reject_rows(
+    report: IngestReport, frame: pd.DataFrame, mask: pd.Series, error_type: str, message: str
+) -> None:
+    """Отклоняет строки кадра по маске; номер строки — индекс кадра + 1."""
+    rows = frame.index[mask.to_numpy()]
+    # Значения строк достаются лениво — только для сохраняемых примеров
+    report.reject_many(
+        error_type,
+        len(rows),
+        message,
+        ((int(index) + 1, _row_values(frame.loc[index])) for index in rows),
+    )
+
+
+def _has_columns(frame: pd.DataFrame, columns: Tuple[str, ...], report: IngestReport) -> bool:
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        _reject_rows(
+            report,
+            frame,
+            pd.Series(True, index=frame.index),
+            "missing_column",
+            f"Нет колонок {missing}",
+        )
+    return not missing
+
+
+def _parse_dates(column: pd.Series, formats: Tuple[str, ...]) -> pd.Series:
+    """Колонка дат: типизированная берётся как есть, строки разбираются по первому подошедшему формату."""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    parsed = pd.to_datetime(column, format=formats[0], errors="coerce")
+    for fmt in formats[1:]:
+        parsed = parsed.fillna(pd.to_datetime(column, format=fmt, errors="coerce"))
+    return parsed
+
+
+def _parse_numbers(column: pd.Series, integer: bool = False) -> pd.Series:
+    """Числовая колонка; нечисловые (а для целых — дробные) значения становятся NaN."""
+    numbers = pd.to_numeric(column, errors="coerce")
+    if integer:
+        numbers = numbers.where(np.floor(numbers) == numbers)
+    return numbers
+
+
+def read_csv_chunks(
+    file: Union[TextIO, str], chunk_rows: int, **options
+) -> Iterator[pd.DataFrame]:
+    """
+    CSV кусками по chunk_rows строк, все значения — строки как есть (пустая
+    строка не превращается в NaN). Индекс кусков сквозной: номер строки данных минус один.
+    """
+    return pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_rows, **options)
+
+
+def parse_supplies_frame(frame: pd.DataFrame, report: IngestReport) -> pd.DataFrame:
+    """
+    Кадр выгрузки supplies → проверенные колонки поставок (имена — поля CoalPile);
+    проверка идёт по колонкам целиком.
+    """
+    if not _has_columns(frame, SUPPLIES_COLUMNS, report):
+        return pd.DataFrame()
+    formation_date = _parse_dates(frame["ВыгрузкаНаСклад"], ("%Y-%m-%d",))
+    pile_id = _parse_numbers(frame["Штабель"], integer=True)
+    warehouse_id = _parse_numbers(frame["Склад"], integer=True)
+    volume = _parse_numbers(frame["На склад, тн"])
+    coal_type = frame["Наим. ЕТСНГ"]
+
+    invalid_date = formation_date.isna()
+    invalid_value = ~invalid_date & (
+        pile_id.isna() | warehouse_id.isna() | volume.isna() | coal_type.isna()
+    )
+    _reject_rows(report, frame, invalid_date, "invalid_date", "Неверный формат даты. Ожидается YYYY-MM-DD.")
+    _reject_rows(report, frame, invalid_value, "invalid_value", "Пустое или нечисловое значение")
+    valid = ~(invalid_date | invalid_value)
+    report.rows_parsed += int(valid.sum())
+
+    # Проверенные колонки идут в репозиторий как есть, без объекта на каждую строку
+    return pd.DataFrame(
+        {
+            "pile_id": pile_id[valid].astype("int64"),
+            "coal_type": coal_type[valid].astype(str),
+            "formation_date": formation_date[valid].dt.normalize(),
+            "initial_volume_tonnes": volume[valid].astype(float),
+            "warehouse_id": warehouse_id[valid].astype("int64"),
+        }
+    )
+
+
+def parse_temperature_frame(frame: pd.DataFrame, report: IngestReport) -> pd.DataFrame:
+    """
+    Кадр выгрузки temperature → проверенные колонки замеров (имена — поля
+    TemperatureReading); проверка идёт по колонкам целиком.
+    """
+    if not _has_columns(frame, TEMPERATURE_COLUMNS, report):
+        return pd.DataFrame()
+    measurement_date = _parse_dates(frame["Дата акта"], ("%Y-%m-%d",))
+    pile_id = _parse_numbers(frame["Штабель"], integer=True)
+    warehouse_id = _parse_numbers(frame["Склад"], integer=True)
+    temperature = _parse_numbers(frame["Максимальная температура"])
+    picket = frame["Пикет"] if "Пикет" in frame.columns else pd.Series(None, index=frame.index)
+    shift_raw = frame["Смена"] if "Смена" in frame.columns else pd.Series(None, index=frame.index)
+    # Смена необязательна, но если указана — должна быть числом
+    shift_raw = shift_raw.where(shift_raw != "")
+    shift = np.trunc(_parse_numbers(shift_raw))
+
+    invalid_date = measurement_date.isna()
+    invalid_value = ~invalid_date & (
+        pile_id.isna() | warehouse_id.isna() | temperature.isna() | (shift_raw.notna() & shift.isna())
+    )
+    _reject_rows(report, frame, invalid_date, "invalid_date", "Неверный формат даты. Ожидается YYYY-MM-DD.")
+    _reject_rows(report, frame, invalid_value, "invalid_value", "Пустое или нечисловое значение")
+    valid = ~(invalid_date | invalid_value)
+    report.rows_parsed += int(valid.sum())
+
+    return pd.DataFrame(
+        {
+            "pile_id": pile_id[valid].astype("int64"),
+            "warehouse_id": warehouse_id[valid].astype("int64"),
+            "measurement_date": measurement_date[valid].dt.normalize(),
+            "temperature": temperature[valid].astype(float),
+            "picket": picket[valid].astype("string"),
+            "shift": shift[valid].astype("Int64"),
+        }
+    )
+
+
+def parse_fire_frame(frame: pd.DataFrame, report: IngestReport) -> pd.DataFrame:
+    """
+    Кадр выгрузки fires → проверенные колонки актов о возгорании (имена — поля
+    FireIncident); проверка идёт по колонкам целиком.
+    """
+    if not _has_columns(frame, FIRE_COLUMNS, report):
+        return pd.DataFrame()
+    formats = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+    document_date = _parse_dates(frame["Дата составления"], formats)
+    fire_start = _parse_dates(frame["Дата начала"], formats)
+    pile_id = _parse_numbers(frame["Штабель"], integer=True)
+    warehouse_id = _parse_numbers(frame["Склад"], integer=True)
+    weight = _parse_numbers(frame["Вес по акту, тн"])
+
+    invalid_date = document_date.isna() | fire_start.isna()
+    invalid_value = ~invalid_date & (pile_id.isna() | warehouse_id.isna() | weight.isna())
+    _reject_rows(report, frame, invalid_date, "invalid_date", "Не удалось распознать дату")
+    _reject_rows(report, frame, invalid_value, "invalid_value", "Пустое или нечисловое значение")
+    valid = ~(invalid_date | invalid_value)
+    report.rows_parsed += int(valid.sum())
+
+    return pd.DataFrame(
+        {
+            "pile_id": pile_id[valid].astype("int64"),
+            "warehouse_id": warehouse_id[valid].astype("int64"),
+            "actual_date": fire_start[valid].dt.normalize(),
+            "document_date": document_date[valid].dt.normalize(),
+            "weight_act": weight[valid].astype(float),
+        }
+    )
+
+
+FRAME_PARSERS = {
+    "supplies": parse_supplies_frame,
+    "temperature": parse_temperature_frame,
+    "fires": parse_fire_frame,
+}
+
+
+def iter_arrow_frames(
+    source: Union[str, BinaryIO], file_format: str, batch_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Читает Parquet или Arrow IPC (файл или поток) пакетами записей: колонки
+    приходят уже типизированными, без разбора строк. Индекс кадров сквозной —
+    номер строки данных минус один, как у кусков pd.read_csv.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Загрузка Parquet/Arrow недоступна: не установлен пакет pyarrow") from None
+
+    if file_format == "parquet":
+        batches = pq.ParquetFile(source).iter_batches(batch_size=batch_rows)
+    else:
+        batches = _arrow_ipc_batches(pa, source)
+
+    offset = 0
+    for batch in batches:
+        frame = batch.to_pandas(date_as_object=False)
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        yield frame
+
+
+def _arrow_ipc_batches(pa, source: Union[str, BinaryIO]) -> Iterator:
+    try:
+        reader = pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # Не файловый формат Arrow IPC — читаем как поток
+        if hasattr(source, "seek"):
+            source.seek(0)
+        yield from pa.ipc.open_stream(source)
+        return
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
+
+def detect_file_format(filename: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Формат ('csv', 'parquet', 'arrow', 'zip') и сжатие ('gzip', 'zstd')
+    по расширению имени файла; None — если расширение не распознано.
+    """
+    stem, extension = os.path.splitext(filename.lower())
+    compression = COMPRESSION_EXTENSIONS.get(extension)
+    if compression:
+        stem, extension = os.path.splitext(stem)
+        # Сжатым может быть только CSV; имя без расширения внутри (data.gz) — тоже CSV
+        return ("csv" if extension in ("", ".csv") else None), compression
+    return FORMAT_EXTENSIONS.get(extension), None
+
+
+def missing_dependency(file_format: str, compression: Optional[str] = None) -> Optional[str]:
+    """Имя неустановленного необязательного пакета, без которого формат не прочитать."""
+    if file_format in COLUMNAR_FORMATS and importlib.util.find_spec("pyarrow") is None:
+        return "pyarrow"
+    if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+        return "zstandard"
+    return None
+
+
+@contextmanager
+def open_csv(source: Union[str, BinaryIO], compression: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Текстовый поток CSV из пути или бинарного потока; gzip и zstd
+    распаковываются по мере чтения, файл целиком в память не попадает.
+    """
+    with ExitStack() as stack:
+        stream = stack.enter_context(open(source, "rb")) if isinstance(source, str) else source
+        if compression == "gzip":
+            stream = stack.enter_context(gzip.GzipFile(fileobj=stream))
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("Загрузка zstd недоступна: не установлен пакет zstandard") from None
+            stream = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(stream))
+        elif compression is not None:
+            raise ValueError(f"Неизвестное сжатие: {compression}")
+
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        try:
+            yield text
+        finally:
+            # Закрытием исходного потока распоряжается владелец, а не обёртка
+            text.detach()
+
+
+def split_csv(path: str, chunk_bytes: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Делит CSV-файл на диапазоны байтов примерно по chunk_bytes, выровненные
+    по концам строк: переход к каждой границе и дочитывание до перевода строки,
+    сами данные здесь не читаются. Возвращает заголовок и список (start, end).
+    Предполагается, что значения не содержат переводов строк (так устроены выгрузки).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        ranges = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()  # дочитываем строку, на которую попала граница
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return fieldnames, ranges
+
+
+def parse_csv_range(
+    path: str,
+    start: int,
+    end: int,
+    fieldnames: List[str],
+    data_type: str,
+    max_error_samples: int,
+) -> Tuple[pd.DataFrame, IngestReport, int]:
+    """
+    Разбор одного диапазона файла в процессе пула: проверенные колонки, отчёт по этой части
+    (номера строк — от начала диапазона) и число строк диапазона для сдвига номеров.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    report = IngestReport(data_type=data_type, max_error_samples=max_error_samples)
+    frame = pd.read_csv(
+        io.StringIO(data.decode("utf-8"), newline=""),
+        names=fieldnames,
+        header=None,
+        dtype=str,
+        keep_default_na=False,
+    )
+    return FRAME_PARSERS[data_type](frame, report), report, data.count(b"\n")
+
+
+def bundle_members(archive: zipfile.ZipFile) -> Dict[str, Tuple[str, str, Optional[str]]]:
+    """
+    Файлы архива по типам данных: {data_type: (имя, формат, сжатие)}.
+    Каталоги и служебные файлы (__MACOSX, скрытые) пропускаются; неизвестный
+    или повторяющийся тип — ошибка до начала загрузки.
+    """
+    members: Dict[str, Tuple[str, str, Optional[str]]] = {}
+    for info in archive.infolist():
+        basename = os.path.basename(info.filename)
+        if info.is_dir() or not basename or basename.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        data_type = basename.split(".", 1)[0].lower()
+        file_format, compression = detect_file_format(basename)
+        if data_type not in BUNDLE_ORDER or file_format not in ("csv", *COLUMNAR_FORMATS):
+            raise ValueError(
+                f"Неизвестный файл в архиве: {info.filename}. "
+                f"Ожидаются {', '.join(BUNDLE_ORDER)} в формате CSV (в т.ч. .gz, .zst), Parquet или Arrow"
+            )
+        if data_type in members:
+            raise ValueError(f"В архиве несколько файлов типа {data_type}")
+        members[data_type] = (info.filename, file_format, compression)
+    if not members:
+        raise ValueError("Архив не содержит файлов данных")
+    return members
+
 
 class UploadDataService:
     """
-    Use Case для загрузки CSV-файлов и сохранения данных в репозитории.
+    Use Case для загрузки файлов данных и сохранения их в репозитории.
+    Файл читается потоково кусками, строки проверяются по колонкам целиком
+    и пишутся в БД пакетами по batch_size, поэтому память не растёт с размером файла.
     """
 
     def __init__(
@@ -30,167 +427,543 @@ class UploadDataService:
         fire_repo: FireIncidentRepository,
         pile_repo: CoalPileRepository,
         weather_repo: WeatherRepository,
+        feature_refresher: Optional[RefreshPileFeatures] = None,
+        batch_size: int = 5000,
+        parse_workers: int = 1,
+        parallel_parse_min_bytes: int = 64 * 1024 * 1024,
+        parse_chunk_bytes: int = 16 * 1024 * 1024,
+        max_error_samples: int = 5,
+        unit_of_work: Optional[UnitOfWork] = None,
     ):
         self.temperature_repo = temperature_repo
         self.fire_repo = fire_repo
         self.pile_repo = pile_repo
         self.weather_repo = weather_repo
+        self.feature_refresher = feature_refresher
+        self.batch_size = batch_size
+        self.parse_workers = parse_workers
+        self.parallel_parse_min_bytes = parallel_parse_min_bytes
+        self.parse_chunk_bytes = parse_chunk_bytes
+        self.max_error_samples = max_error_samples
+        self.unit_of_work = unit_of_work
+        # Диапазоны обновления признаков, отложенные до конца загрузки архива
+        self._deferred_refreshes: Optional[List[Tuple[date, Optional[date], Optional[List[int]]]]] = None
 
-    def upload_csv(self, file: TextIOWrapper, data_type: str) -> None:
+    def upload_csv(
+        self,
+        file: TextIOWrapper,
+        data_type: str,
+        on_progress: Optional[Callable[..., None]] = None,
+    ) -> IngestReport:
         """
         Загружает CSV-файл в систему.
         Поддерживаемые типы: 'temperature', 'fires', 'supplies', 'weather'
+
+        on_progress вызывается после каждого записанного пакета со счётчиками
+        rows_parsed, rows_written, rows_skipped (уже были в БД), rows_rejected.
+        Возвращает отчёт о загрузке.
         """
-        if data_type == "temperature":
-            self._upload_temperatures(file)
-        elif data_type == "fires":
-            self._upload_fires(file)
-        elif data_type == "supplies":
-            self._upload_supplies(file)
-        elif data_type == "weather":
-            self._upload_weather(file)
+        if data_type != "weather" and data_type not in FRAME_PARSERS:
+            raise ValueError(f"Неизвестный тип данных: {data_type}")
+
+        started = time.perf_counter()
+        report = IngestReport(data_type=data_type, max_error_samples=self.max_error_samples)
+        if data_type == "weather":
+            chunks = read_csv_chunks(
+                file, WEATHER_CHUNK_ROWS, usecols=lambda column: column in WEATHER_COLUMNS
+            )
+            self._upload_weather(chunks, report, on_progress)
         else:
+            # Строки проверяются по колонкам кусками, без модели и strptime на каждую строку
+            parse = FRAME_PARSERS[data_type]
+            frames = (parse(chunk, report) for chunk in read_csv_chunks(file, CSV_CHUNK_ROWS))
+            self._store(data_type, frames, report, on_progress)
+        return self._finish(report, started)
+
+    def upload_table(
+        self,
+        source: Union[str, BinaryIO],
+        data_type: str,
+        file_format: str,
+        on_progress: Optional[Callable[..., None]] = None,
+    ) -> IngestReport:
+        """
+        Загружает файл Parquet или Arrow IPC (путь или бинарный поток).
+        Пакеты записей приходят типизированными колонками и проверяются
+        по колонкам целиком, без разбора строк и валидации каждой записи.
+        """
+        if data_type != "weather" and data_type not in FRAME_PARSERS:
             raise ValueError(f"Неизвестный тип данных: {data_type}")
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Неизвестный формат файла: {file_format}")
 
-    def _upload_supplies(self, file: TextIOWrapper) -> None:
-        """Загружает данные из supplies.csv"""
-        reader = csv.DictReader(file)
-        piles = []
-        for row_num, row in enumerate(reader, start=1):
+        started = time.perf_counter()
+        report = IngestReport(data_type=data_type, max_error_samples=self.max_error_samples)
+        # Погода сворачивается по дням — пакеты можно брать крупнее
+        batch_rows = WEATHER_CHUNK_ROWS if data_type == "weather" else self.batch_size
+        frames = iter_arrow_frames(source, file_format, batch_rows)
+        if data_type == "weather":
+            self._upload_weather(
+                (frame[[c for c in frame.columns if c in WEATHER_COLUMNS]] for frame in frames),
+                report,
+                on_progress,
+            )
+        else:
+            parse = FRAME_PARSERS[data_type]
+            self._store(data_type, (parse(frame, report) for frame in frames), report, on_progress)
+        return self._finish(report, started)
+
+    def upload_source(
+        self,
+        source: Union[str, BinaryIO],
+        data_type: str,
+        file_format: str = "csv",
+        compression: Optional[str] = None,
+        on_progress: Optional[Callable[..., None]] = None,
+    ) -> IngestReport:
+        """Загружает один файл любого поддерживаемого формата из пути или бинарного потока."""
+        if file_format in COLUMNAR_FORMATS:
+            return self.upload_table(source, data_type, file_format, on_progress)
+        if file_format != "csv":
+            raise ValueError(f"Неизвестный формат файла: {file_format}")
+        with open_csv(source, compression) as file:
+            return self.upload_csv(file, data_type, on_progress)
+
+    def upload_file(
+        self,
+        path: str,
+        data_type: str,
+        on_progress: Optional[Callable[..., None]] = None,
+        file_format: str = "csv",
+        compression: Optional[str] = None,
+    ) -> IngestReport:
+        """
+        Загружает файл с диска. Parquet, Arrow и сжатые CSV читаются потоком
+        через upload_source. Несжатые CSV от parallel_parse_min_bytes разбираются
+        параллельно: диапазоны строк парсятся в пуле процессов, а записи
+        в исходном порядке идут в ту же пакетную запись. Погода уже
+        агрегируется векторно и всегда читается одним потоком.
+        """
+        if file_format != "csv" or compression is not None:
+            return self.upload_source(path, data_type, file_format, compression, on_progress)
+        if (
+            data_type not in FRAME_PARSERS
+            or self.parse_workers <= 1
+            or os.path.getsize(path) < self.parallel_parse_min_bytes
+        ):
+            with open(path, encoding="utf-8", newline="") as file:
+                return self.upload_csv(file, data_type, on_progress)
+
+        started = time.perf_counter()
+        report = IngestReport(
+            data_type=data_type,
+            parse_workers=self.parse_workers,
+            max_error_samples=self.max_error_samples,
+        )
+        self._store(data_type, self._parse_parallel(path, data_type, report), report, on_progress)
+        return self._finish(report, started)
+
+    def upload_bundle(
+        self,
+        source: Union[str, BinaryIO],
+        on_progress: Optional[Callable[..., None]] = None,
+    ) -> BundleReport:
+        """
+        Загружает zip-архив с файлами нескольких типов: тип берётся из имени
+        файла (supplies.csv, temperature.csv.gz, fires.parquet, weather.csv.zst).
+        Файлы загружаются в порядке BUNDLE_ORDER одной единицей работы — ошибка
+        в любом из них откатывает весь архив. Признаки обновляются один раз
+        для объединённого диапазона всех файлов.
+        """
+        started = time.perf_counter()
+        bundle = BundleReport()
+        with zipfile.ZipFile(source) as archive:
+            members = bundle_members(archive)
+            logger.info(f"Загрузка архива: {', '.join(members[t][0] for t in BUNDLE_ORDER if t in members)}")
+
+            self._deferred_refreshes = []
             try:
-                try:
-                    formation_date = datetime.strptime(row["ВыгрузкаНаСклад"], "%Y-%m-%d").date()
-                except ValueError:
-                    logger.warning(
-                        f"Пропущена строка {row_num} в supplies.csv: неверный формат даты "
-                        f"'{row.get('ВыгрузкаНаСклад', '<отсутствует>')}'. Ожидается YYYY-MM-DD."
-                    )
-                    continue
-
-                pile = CoalPile(
-                    pile_id=int(row["Штабель"]),
-                    coal_type=row["Наим. ЕТСНГ"],
-                    formation_date=formation_date,
-                    initial_volume_tonnes=float(row["На склад, тн"]),
-                    warehouse_id=int(row["Склад"]),
-                )
-                piles.append(pile)
-                logger.debug(f"Загружена запись supplies.csv: pile_id={pile.pile_id}")
+                with self.unit_of_work or nullcontext():
+                    for data_type in BUNDLE_ORDER:
+                        if data_type not in members:
+                            continue
+                        name, file_format, compression = members[data_type]
+                        progress = self._bundle_progress(bundle, data_type, on_progress)
+                        with archive.open(name) as member:
+                            bundle.add(
+                                self.upload_source(member, data_type, file_format, compression, progress)
+                            )
+                    self._refresh_deferred(bundle)
+            finally:
+                self._deferred_refreshes = None
 
-            except (ValueError, KeyError) as e:
-                logger.error(
-                    f"Пропущена строка {row_num} в supplies.csv: ошибка парсинга — {e}. Строка: {row}"
-                )
+        bundle.elapsed_seconds = round(time.perf_counter() - started, 4)
+        bundle.phases = {phase: round(seconds, 4) for phase, seconds in bundle.phases.items()}
+        logger.info(
+            f"Архив загружен: разобрано {bundle.rows_parsed}, записано {bundle.rows_written}, "
+            f"отклонено {bundle.rows_rejected} строк за {bundle.elapsed_seconds} с"
+        )
+        return bundle
+
+    @staticmethod
+    def _bundle_progress(
+        bundle: BundleReport, data_type: str, on_progress: Optional[Callable[..., None]]
+    ) -> Optional[Callable[..., None]]:
+        """Прогресс файла архива в пересчёте на весь архив (плюс уже загруженные файлы)."""
+        if on_progress is None:
+            return None
+
+        def report(**counters) -> None:
+            on_progress(
+                file=data_type,
+                **{name: getattr(bundle, name) + value for name, value in counters.items()},
+            )
+
+        return report
+
+    def _refresh_deferred(self, bundle: BundleReport) -> None:
+        """Одно обновление признаков, покрывающее диапазоны всех файлов архива."""
+        if not self._deferred_refreshes or self.feature_refresher is None:
+            return
+        start_date = min(start for start, _, _ in self._deferred_refreshes)
+        end_dates = [end for _, end, _ in self._deferred_refreshes]
+        end_date = None if None in end_dates else max(end_dates)
+        pile_id_lists = [pile_ids for _, _, pile_ids in self._deferred_refreshes]
+        pile_ids = (
+            None
+            if any(ids is None for ids in pile_id_lists)
+            else sorted({pile_id for ids in pile_id_lists for pile_id in ids})
+        )
+
+        started = time.perf_counter()
+        self.feature_refresher.execute(start_date, end_date=end_date, pile_ids=pile_ids)
+        bundle.phases["refresh_features"] = time.perf_counter() - started
+
+    def _parse_parallel(self, path: str, data_type: str, report: IngestReport) -> Iterator[pd.DataFrame]:
+        fieldnames, ranges = split_csv(path, self.parse_chunk_bytes)
+        logger.info(
+            f"Параллельный разбор {data_type}: {len(ranges)} частей, {self.parse_workers} процессов"
+        )
+        # spawn: пул создаётся из рабочего потока приложения, fork там небезопасен
+        pool = ProcessPoolExecutor(
+            max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        submit = partial(
+            pool.submit,
+            parse_csv_range,
+            path,
+            fieldnames=fieldnames,
+            data_type=data_type,
+            max_error_samples=self.max_error_samples,
+        )
+        try:
+            # В работе не больше двух частей на процесс — память не растёт с размером файла
+            remaining = iter(ranges)
+            pending = deque(submit(*part) for part in islice(remaining, self.parse_workers * 2))
+            # Части приходят по порядку: номера строк сдвигаются на число строк предыдущих частей
+            row_offset = 0
+            while pending:
+                frame, part_report, part_lines = pending.popleft().result()
+                for part in islice(remaining, 1):
+                    pending.append(submit(*part))
+                report.merge(part_report, row_offset=row_offset)
+                row_offset += part_lines
+                yield frame
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _finish(self, report: IngestReport, started: float) -> IngestReport:
+        report.elapsed_seconds = round(time.perf_counter() - started, 4)
+        # Разбор идёт вперемешку с записью — ему достаётся время, не ушедшее на другие фазы
+        report.phases["parse"] = max(report.elapsed_seconds - sum(report.phases.values()), 0.0)
+        report.phases = {phase: round(seconds, 4) for phase, seconds in report.phases.items()}
+
+        logger.info(
+            f"Загрузка {report.data_type}: разобрано {report.rows_parsed}, "
+            f"записано {report.rows_written}, пропущено {report.rows_skipped}, "
+            f"отклонено {report.rows_rejected} строк за {report.elapsed_seconds} с; фазы: {report.phases}"
+        )
+        if report.rows_rejected:
+            logger.warning(
+                f"Отклонённые строки {report.data_type}: {report.errors}; примеры: {report.error_samples}"
+            )
+        return report
+
+    def _store(
+        self,
+        data_type: str,
+        frames: Iterable[pd.DataFrame],
+        report: IngestReport,
+        on_progress: Optional[Callable[..., None]],
+    ) -> None:
+        storers = {
+            "supplies": self._store_supplies,
+            "temperature": self._store_temperatures,
+            "fires": self._store_fires,
+        }
+        storers[data_type](frames, report, on_progress)
+
+    def _save_in_batches(
+        self,
+        rows: Iterable[T],
+        save: Callable[[List[T]], Optional[int]],
+        report: IngestReport,
+        on_progress: Optional[Callable[..., None]],
+    ) -> None:
+        """
+        Пишет поток записей пакетами фиксированного размера.
+        save возвращает число записанных строк (None — записан весь пакет).
+        """
+        batch: List[T] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, save, report, on_progress)
+                batch = []
+        self._flush(batch, save, report, on_progress)
+
+    def _save_frames(
+        self,
+        frames: Iterable[pd.DataFrame],
+        save: Callable[[pd.DataFrame], Optional[int]],
+        report: IngestReport,
+        on_progress: Optional[Callable[..., None]],
+    ) -> None:
+        """
+        Пишет поток проверенных кадров пакетами по batch_size строк: куски
+        склеиваются и режутся по размеру пакета, строки в объекты не превращаются.
+        """
+        pending: List[pd.DataFrame] = []
+        pending_rows = 0
+        for frame in frames:
+            if frame.empty:
                 continue
+            pending.append(frame)
+            pending_rows += len(frame)
+            if pending_rows < self.batch_size:
+                continue
+            batch = pd.concat(pending) if len(pending) > 1 else pending[0]
+            full = len(batch) - len(batch) % self.batch_size
+            for start in range(0, full, self.batch_size):
+                self._flush(batch.iloc[start : start + self.batch_size], save, report, on_progress)
+            pending = [batch.iloc[full:]]
+            pending_rows = len(batch) - full
+        if pending_rows:
+            self._flush(pd.concat(pending), save, report, on_progress)
+
+    def _flush(
+        self,
+        batch: Union[List[T], pd.DataFrame],
+        save: Callable[..., Optional[int]],
+        report: IngestReport,
+        on_progress: Optional[Callable[..., None]],
+    ) -> None:
+        if not len(batch):
+            return
+        started = time.perf_counter()
+        written = save(batch)
+        report.add_phase("write", time.perf_counter() - started)
+        if written is None:
+            written = len(batch)
+        report.rows_written += written
+        report.rows_skipped += len(batch) - written
+        if on_progress:
+            on_progress(
+                rows_parsed=report.rows_parsed,
+                rows_written=report.rows_written,
+                rows_skipped=report.rows_skipped,
+                rows_rejected=report.rows_rejected,
+            )
+
+    def _store_supplies(
+        self, frames: Iterable[pd.DataFrame], report: IngestReport, on_progress: Optional[Callable[..., None]]
+    ) -> None:
+        """Записывает поставки из supplies.csv"""
+        start_dates: List[pd.Timestamp] = []
+        pile_ids = set()
+
+        def save(batch: pd.DataFrame) -> int:
+            start_dates.append(batch["formation_date"].min())
+            pile_ids.update(batch["pile_id"].unique().tolist())
+            return self.pile_repo.save_columns(batch)
+
+        self._save_frames(frames, save, report, on_progress)
 
-        if not piles:
+        if not report.rows_parsed:
             raise ValueError("Не удалось загрузить ни одной корректной записи из supplies.csv")
 
-        for pile in piles:
-            self.pile_repo.save(pile)
+        # Новые поставки меняют атрибуты штабеля во всех днях после первой из них
+        self._refresh_features(report, min(start_dates).date(), pile_ids=sorted(pile_ids))
 
-    def _upload_temperatures(self, file: TextIOWrapper) -> None:
-        """Загружает данные из temperature.csv"""
-        reader = csv.DictReader(file)
-        readings = []
-        for row_num, row in enumerate(reader, start=1):
-            try:
-                logger.debug(f"[TEMP] Обработка строки {row_num}: {row}")
-                measurement_date = datetime.strptime(row["Дата акта"], "%Y-%m-%d").date()
-                reading = TemperatureReading(
-                    pile_id=int(row["Штабель"]),
-                    warehouse_id=int(row["Склад"]),
-                    measurement_date=measurement_date,
-                    temperature=float(row["Максимальная температура"]),
-                    picket=row.get("Пикет"),
-                    shift=int(float(row["Смена"])) if row.get("Смена") else None,
-                )
-                readings.append(reading)
-                logger.debug(f"[TEMP] Успешно создана запись: {reading}")
-            except (ValueError, KeyError) as e:
-                logger.error(
-                    f"[TEMP] Пропущена строка {row_num} в temperature.csv: ошибка парсинга — {e}. Строка: {row}"
-                )
-                continue
-            except Exception as e:
-                logger.exception(f"[TEMP] Неожиданная ошибка в строке {row_num}: {e}")
-                raise
+    def _store_temperatures(
+        self, frames: Iterable[pd.DataFrame], report: IngestReport, on_progress: Optional[Callable[..., None]]
+    ) -> None:
+        """Записывает замеры из temperature.csv"""
+        start_dates: List[pd.Timestamp] = []
+        pile_ids = set()
+
+        def save(batch: pd.DataFrame) -> int:
+            start_dates.append(batch["measurement_date"].min())
+            pile_ids.update(batch["pile_id"].unique().tolist())
+            return self.temperature_repo.save_columns(batch)
 
-        if not readings:
+        self._save_frames(frames, save, report, on_progress)
+
+        if not report.rows_parsed:
             raise ValueError("Не удалось загрузить ни одной корректной записи из temperature.csv")
 
-        logger.info(f"[TEMP] Сохранение {len(readings)} записей температуры в БД")
-        self.temperature_repo.save_batch(readings)
+        # Замер влияет на свой день и на 7-дневные окна следующих дней
+        self._refresh_features(report, min(start_dates).date(), pile_ids=sorted(pile_ids))
 
+    def _store_fires(
+        self, frames: Iterable[pd.DataFrame], report: IngestReport, on_progress: Optional[Callable[..., None]]
+    ) -> None:
+        """Записывает акты из fires.csv"""
+        start_dates: List[pd.Timestamp] = []
 
-    def _upload_fires(self, file: TextIOWrapper) -> None:
-        """Загружает данные из fires.csv"""
-        reader = csv.DictReader(file)
-        incidents = []
-        for row_num, row in enumerate(reader, start=1):
-            try:
-                doc_date = self._parse_datetime_flexible(row["Дата составления"])
-                fire_start = self._parse_datetime_flexible(row["Дата начала"])
-
-                incident = FireIncident(
-                    pile_id=int(row["Штабель"]),
-                    warehouse_id=int(row["Склад"]),
-                    actual_date=fire_start.date(),
-                    document_date=doc_date.date(),
-                    weight_act=float(row["Вес по акту, тн"]),
-                )
-                incidents.append(incident)
-                logger.debug(f"Загружена запись fires.csv: pile_id={incident.pile_id}, fire_date={fire_start.date()}")
-            except (ValueError, KeyError) as e:
-                logger.error(
-                    f"Пропущена строка {row_num} в fires.csv: ошибка парсинга — {e}. Строка: {row}"
-                )
-                continue
+        def save(batch: pd.DataFrame) -> int:
+            start_dates.append(batch["actual_date"].min())
+            return self.fire_repo.save_columns(batch)
+
+        self._save_frames(frames, save, report, on_progress)
 
-        if not incidents:
+        if not report.rows_parsed:
             raise ValueError("Не удалось загрузить ни одной корректной записи из fires.csv")
 
-        self.fire_repo.save_batch(incidents)
+        # Число пожаров за год считается по всему складу — затронуты все штабели
+        self._refresh_features(report, min(start_dates).date())
 
-    def _upload_weather(self, file: TextIOWrapper) -> None:
-        """Загружает данные из weather.csv (ежечасные) и агрегирует по дням"""
-        reader = csv.DictReader(file)
-        daily_data = {}
-        for row_num, row in enumerate(reader, start=1):
-            try:
-                dt = datetime.strptime(row["date"], "%Y-%m-%d %H:%M:%S")
-                date_key = dt.date()
-                temp = float(row["t"])
-                humidity = float(row["humidity"])
-
-                if date_key not in daily_data:
-                    daily_data[date_key] = {"temps": [], "humidities": []}
-                daily_data[date_key]["temps"].append(temp)
-                daily_data[date_key]["humidities"].append(humidity)
-            except (ValueError, KeyError) as e:
-                logger.error(
-                    f"Пропущена строка {row_num} в weather.csv: ошибка парсинга — {e}. Строка: {row}"
-                )
-                continue
-
-        if not daily_data:
+    def _upload_weather(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        report: IngestReport,
+        on_progress: Optional[Callable[..., None]],
+    ) -> None:
+        """Загружает ежечасные данные weather (кусками кадра) и агрегирует по дням"""
+        started = time.perf_counter()
+        daily = self._aggregate_weather(chunks, report)
+        report.add_phase("aggregate", time.perf_counter() - started)
+        if daily.empty:
             raise ValueError("Не удалось загрузить ни одной корректной записи из weather.csv")
 
-        weathers = []
-        for date_key, values in daily_data.items():
-            avg_temp = sum(values["temps"]) / len(values["temps"])
-            avg_humidity = sum(values["humidities"]) / len(values["humidities"])
-            weather = WeatherData(date=date_key, air_temperature=avg_temp, humidity=avg_humidity)
-            weathers.append(weather)
-            logger.debug(f"Агрегирована погода за {date_key}")
+        weathers = [
+            WeatherData(
+                date=day.date(),
+                air_temperature=row.air_temperature,
+                humidity=row.humidity,
+                temp_min=row.temp_min,
+                temp_max=row.temp_max,
+                pressure=None if pd.isna(row.pressure) else int(round(row.pressure)),
+                wind_speed_avg=None if pd.isna(row.wind_speed_avg) else row.wind_speed_avg,
+                wind_speed_max=None if pd.isna(row.wind_speed_max) else row.wind_speed_max,
+                precipitation=None if pd.isna(row.precipitation) else row.precipitation,
+            )
+            for day, row in daily.iterrows()
+        ]
+        self._save_in_batches(weathers, self.weather_repo.save_batch, report, on_progress)
 
-        self.weather_repo.save_batch(weathers)
+        self._refresh_features(report, weathers[0].date, end_date=weathers[-1].date)
 
-    def _parse_datetime_flexible(self, date_str: str) -> datetime:
-        """Парсит дату с поддержкой форматов с и без времени"""
-        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        raise ValueError(f"Не удалось распознать дату: {date_str}")
\ No newline at end of file
+    def _aggregate_weather(self, chunks: Iterable[pd.DataFrame], report: IngestReport) -> pd.DataFrame:
+        """
+        Суточные агрегаты по ежечасным наблюдениям: каждый кусок файла
+        сворачивается groupby по дню в частичные суммы/минимумы/максимумы,
+        которые затем объединяются.
+        Строка без даты, температуры или влажности отклоняется; пропуски в
+        остальных полях просто не участвуют в агрегатах.
+        """
+        partials = []
+        for chunk in chunks:
+            missing = {"date", "t", "humidity"} - set(chunk.columns)
+            if missing:
+                raise ValueError(f"В weather.csv нет колонок: {sorted(missing)}")
+
+            frame = pd.DataFrame(
+                {
+                    "day": _parse_dates(chunk["date"], ("%Y-%m-%d %H:%M:%S",)).dt.normalize(),
+                    **{
+                        column: pd.to_numeric(chunk[column], errors="coerce")
+                        if column in chunk.columns
+                        else np.nan
+                        for column in WEATHER_COLUMNS
+                        if column != "date"
+                    },
+                }
+            )
+            invalid_date = frame["day"].isna()
+            invalid_value = ~invalid_date & (frame["t"].isna() | frame["humidity"].isna())
+            _reject_rows(
+                report, chunk, invalid_date, "invalid_date", "Неверный формат даты. Ожидается YYYY-MM-DD HH:MM:SS."
+            )
+            _reject_rows(report, chunk, invalid_value, "invalid_value", "Нет температуры или влажности")
+            valid = ~(invalid_date | invalid_value)
+            report.rows_parsed += int(valid.sum())
+
+            partials.append(
+                frame[valid]
+                .groupby("day")
+                .agg(
+                    t_sum=("t", "sum"),
+                    t_count=("t", "count"),
+                    temp_min=("t", "min"),
+                    temp_max=("t", "max"),
+                    humidity_sum=("humidity", "sum"),
+                    p_sum=("p", "sum"),
+                    p_count=("p", "count"),
+                    v_avg_sum=("v_avg", "sum"),
+                    v_avg_count=("v_avg", "count"),
+                    wind_speed_max=("v_max", "max"),
+                    precipitation=("precipitation", "sum"),
+                    precipitation_count=("precipitation", "count"),
+                )
+            )
+
+        if not partials:
+            return pd.DataFrame()
+        # День может попасть в два соседних куска — доагрегируем частичные итоги
+        totals = pd.concat(partials).groupby(level=0).agg(
+            {
+                "t_sum": "sum",
+                "t_count": "sum",
+                "temp_min": "min",
+                "temp_max": "max",
+                "humidity_sum": "sum",
+                "p_sum": "sum",
+                "p_count": "sum",
+                "v_avg_sum": "sum",
+                "v_avg_count": "sum",
+                "wind_speed_max": "max",
+                "precipitation": "sum",
+                "precipitation_count": "sum",
+            }
+        ).sort_index()
+
+        return pd.DataFrame(
+            {
+                "air_temperature": totals["t_sum"] / totals["t_count"],
+                "humidity": totals["humidity_sum"] / totals["t_count"],
+                "temp_min": totals["temp_min"],
+                "temp_max": totals["temp_max"],
+                "pressure": (totals["p_sum"] / totals["p_count"]).where(totals["p_count"] > 0),
+                "wind_speed_avg": (totals["v_avg_sum"] / totals["v_avg_count"]).where(totals["v_avg_count"] > 0),
+                "wind_speed_max": totals["wind_speed_max"],
+                "precipitation": totals["precipitation"].where(totals["precipitation_count"] > 0),
+            }
+        )
+
+    def _refresh_features(
+        self,
+        report: IngestReport,
+        start_date: date,
+        end_date: Optional[date] = None,
+        pile_ids: Optional[List[int]] = None,
+    ) -> None:
+        """Обновляет таблицу признаков для затронутых загрузкой штабелей и дней."""
+        if self.feature_refresher is None:
+            return
+        if self._deferred_refreshes is not None:
+            self._deferred_refreshes.append((start_date, end_date, pile_ids))
+            return
+        started = time.perf_counter()
+        self.feature_refresher.execute(start_date, end_date=end_date, pile_ids=pile_ids)
+        report.add_phase("refresh_features", time.perf_counter() - started)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from environs import Env
@@ -19,6 +20,27 @@ class Settings(BaseModel):
     postgres_password: str = env.str("POSTGRES_PASSWORD")
     postgres_db: str = env.str("POSTGRES_DB", default="coal_fire_predictor")
     ML_MODEL_PATH: str = env.str("ML_MODEL_PATH")
+    ML_MODEL_VERSION: str = env.str("ML_MODEL_VERSION", default="v1.0")
+
+    # Загрузка данных: размер пакета записи в БД
+    INGEST_BATCH_SIZE: int = env.int("INGEST_BATCH_SIZE", default=5000)
+    # Параллельный разбор больших файлов: число процессов, порог размера файла и размер части
+    PARSE_WORKERS: int = env.int("PARSE_WORKERS", default=os.cpu_count() or 1)
+    PARALLEL_PARSE_MIN_BYTES: int = env.int("PARALLEL_PARSE_MIN_BYTES", default=64 * 1024 * 1024)
+    PARSE_CHUNK_BYTES: int = env.int("PARSE_CHUNK_BYTES", default=16 * 1024 * 1024)
+    # Сколько примеров строк сохранять в отчёте загрузки на каждый тип ошибки
+    INGEST_ERROR_SAMPLES: int = env.int("INGEST_ERROR_SAMPLES", default=5)
+    # Каталог для файлов, ожидающих фоновой загрузки (по умолчанию — системный temp)
+    UPLOAD_SPOOL_DIR: str = env.str("UPLOAD_SPOOL_DIR", default=None)
+
+    # Кэш ответов GET-эндпоинтов (дашборд, история, аналитика): число ответов в памяти
+    RESPONSE_CACHE_SIZE: int = env.int("RESPONSE_CACHE_SIZE", default=256)
+
+    # Фоновые задачи
+    JOB_WORKERS: int = env.int("JOB_WORKERS", default=1)
+    JOB_HISTORY_SIZE: int = env.int("JOB_HISTORY_SIZE", default=100)
+    # Пауза перед пересчётом: загрузки, пришедшие за это время, объединяются в один запуск
+    RECOMPUTE_DEBOUNCE_SECONDS: float = env.float("RECOMPUTE_DEBOUNCE_SECONDS", default=2.0)
 
     @property
     def database_url(self) -> str:
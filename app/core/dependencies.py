@@ -1,28 +1,45 @@
-from typing import Generator
+import os
+import time
+from datetime import date
+from functools import partial
+from typing import Generator, Hashable, List, Optional
 from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
+from app.application.use_cases.backfill_forecasts import BackfillForecasts
 from app.application.use_cases.calculate_fire_risk import CalculateFireRisk
 from app.application.use_cases.evaluate_model_quality import EvaluateModelQuality
 from app.application.use_cases.get_dashboard_data import GetDashboardData
 from app.application.use_cases.get_pile_history import GetPileHistory
+from app.application.use_cases.refresh_pile_features import RefreshPileFeatures
+from app.application.use_cases.upload_data import UploadDataService
 from app.core.config import settings
+from app.domain.entities import Job
 from app.domain.interfaces import (
     CoalPileRepository,
     TemperatureRepository,
     FireIncidentRepository,
     WeatherRepository,
     PredictionRepository,
+    PileFeatureRepository,
     MLService,
+    DashboardReadModel,
+    UnitOfWork,
 )
+from app.infrastructure.cache.response_cache import ResponseCache
 from app.infrastructure.database.repositories import (
     SQLAlchemyCoalPileRepository,
     SQLAlchemyTemperatureRepository,
     SQLAlchemyFireIncidentRepository,
     SQLAlchemyWeatherRepository,
     SQLAlchemyPredictionRepository,
+    SQLAlchemyPileFeatureRepository,
+    SQLAlchemyDashboardReadModel,
+    SQLAlchemyDataVersion,
+    SQLAlchemyUnitOfWork,
 )
+from app.infrastructure.jobs.queue import JobQueue
 from app.infrastructure.ml.adapter import MLModelAdapter
 
 
@@ -30,6 +47,20 @@ from app.infrastructure.ml.adapter import MLModelAdapter
 engine = create_engine(settings.database_url, echo=settings.debug)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Очередь фоновых задач (одна на процесс приложения)
+job_queue = JobQueue(max_workers=settings.JOB_WORKERS, history_size=settings.JOB_HISTORY_SIZE)
+
+
+def read_data_version() -> Hashable:
+    """Версия данных для кэша ответов — время последней записи в таблицы БД."""
+    with SessionLocal() as session:
+        return SQLAlchemyDataVersion(session).get()
+
+
+# Кэш ответов GET-эндпоинтов; версия данных читается из БД, поэтому записи
+# других воркеров и scripts/ тоже сбрасывают его
+response_cache = ResponseCache(read_data_version, max_entries=settings.RESPONSE_CACHE_SIZE)
+
 
 def get_db_session() -> Generator[Session, None, None]:
     """Фабрика сессии БД для FastAPI Depends."""
@@ -63,6 +94,18 @@ def get_prediction_repository(session: Session = Depends(get_db_session)) -> Pre
     return SQLAlchemyPredictionRepository(session)
 
 
+def get_pile_feature_repository(session: Session = Depends(get_db_session)) -> PileFeatureRepository:
+    return SQLAlchemyPileFeatureRepository(session)
+
+
+def get_dashboard_read_model(session: Session = Depends(get_db_session)) -> DashboardReadModel:
+    return SQLAlchemyDashboardReadModel(session)
+
+
+def get_unit_of_work(session: Session = Depends(get_db_session)) -> UnitOfWork:
+    return SQLAlchemyUnitOfWork(session)
+
+
 def get_ml_service() -> MLService:
     return MLModelAdapter()
 
@@ -75,6 +118,7 @@ def get_calculate_fire_risk(
     weather_repo=Depends(get_weather_repository),
     pred_repo=Depends(get_prediction_repository),
     ml_service=Depends(get_ml_service),
+    feature_repo=Depends(get_pile_feature_repository),
 ) -> CalculateFireRisk:
     return CalculateFireRisk(
         pile_repo=pile_repo,
@@ -83,25 +127,33 @@ def get_calculate_fire_risk(
         weather_repo=weather_repo,
         prediction_repo=pred_repo,
         ml_service=ml_service,
+        feature_repo=feature_repo,
     )
 
 
-def get_get_dashboard_data(
+def get_refresh_pile_features(
     pile_repo=Depends(get_coal_pile_repository),
     temp_repo=Depends(get_temperature_repository),
-    pred_repo=Depends(get_prediction_repository),
     fire_repo=Depends(get_fire_incident_repository),
     weather_repo=Depends(get_weather_repository),
-) -> GetDashboardData:
-    return GetDashboardData(
+    feature_repo=Depends(get_pile_feature_repository),
+) -> RefreshPileFeatures:
+    return RefreshPileFeatures(
         pile_repo=pile_repo,
         temp_repo=temp_repo,
-        pred_repo=pred_repo,
         fire_repo=fire_repo,
         weather_repo=weather_repo,
+        feature_repo=feature_repo,
     )
 
 
+def get_get_dashboard_data(
+    read_model=Depends(get_dashboard_read_model),
+    weather_repo=Depends(get_weather_repository),
+) -> GetDashboardData:
+    return GetDashboardData(read_model=read_model, weather_repo=weather_repo)
+
+
 def get_get_pile_history(
     pile_repo=Depends(get_coal_pile_repository),
     temp_repo=Depends(get_temperature_repository),
@@ -114,4 +166,166 @@ def get_evaluate_model_quality(
     pred_repo=Depends(get_prediction_repository),
     fire_repo=Depends(get_fire_incident_repository),
 ) -> EvaluateModelQuality:
-    return EvaluateModelQuality(pred_repo, fire_repo)
\ No newline at end of file
+    return EvaluateModelQuality(pred_repo, fire_repo)
+
+
+def get_job_queue() -> JobQueue:
+    return job_queue
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
+
+
+def build_calculate_fire_risk(session: Session) -> CalculateFireRisk:
+    """Сборка CalculateFireRisk вне запроса (для фоновых задач со своей сессией)."""
+    pile_repo = SQLAlchemyCoalPileRepository(session)
+    return CalculateFireRisk(
+        pile_repo=pile_repo,
+        temp_repo=SQLAlchemyTemperatureRepository(session),
+        fire_repo=SQLAlchemyFireIncidentRepository(session, pile_repo),
+        weather_repo=SQLAlchemyWeatherRepository(session),
+        prediction_repo=SQLAlchemyPredictionRepository(session),
+        ml_service=get_ml_service(),
+        feature_repo=SQLAlchemyPileFeatureRepository(session),
+    )
+
+
+def run_forecast_recompute(job: Job) -> dict:
+    """Фоновый пересчёт прогноза: только штабели с новыми данными."""
+    with SessionLocal() as session:
+        use_case = build_calculate_fire_risk(session)
+        use_case.execute(only_changed=True)
+        return use_case.last_run_stats
+
+
+def schedule_forecast_recompute(queue: JobQueue) -> Job:
+    """Ставит пересчёт прогноза в очередь; серия загрузок подряд даёт один запуск."""
+    return queue.submit(
+        "forecast_recompute",
+        run_forecast_recompute,
+        coalesce=True,
+        delay=settings.RECOMPUTE_DEBOUNCE_SECONDS,
+    )
+
+
+def build_backfill_forecasts(session: Session) -> BackfillForecasts:
+    pile_repo = SQLAlchemyCoalPileRepository(session)
+    return BackfillForecasts(
+        pile_repo=pile_repo,
+        temp_repo=SQLAlchemyTemperatureRepository(session),
+        fire_repo=SQLAlchemyFireIncidentRepository(session, pile_repo),
+        weather_repo=SQLAlchemyWeatherRepository(session),
+        prediction_repo=SQLAlchemyPredictionRepository(session),
+        ml_service=get_ml_service(),
+    )
+
+
+def run_forecast_backfill(
+    job: Job, start_date: date, end_date: date, pile_ids: Optional[List[int]] = None
+) -> dict:
+    """Фоновый расчёт прогнозов задним числом за диапазон дат."""
+    with SessionLocal() as session:
+        use_case = build_backfill_forecasts(session)
+        return use_case.execute(
+            start_date,
+            end_date,
+            pile_ids=pile_ids,
+            on_progress=partial(job_queue.update_progress, job.job_id),
+        )
+
+
+def schedule_forecast_backfill(
+    queue: JobQueue, start_date: date, end_date: date, pile_ids: Optional[List[int]] = None
+) -> Job:
+    return queue.submit(
+        "forecast_backfill",
+        partial(run_forecast_backfill, start_date=start_date, end_date=end_date, pile_ids=pile_ids),
+    )
+
+
+def build_upload_data_service(session: Session) -> UploadDataService:
+    """Сборка UploadDataService вне запроса (для фоновой загрузки со своей сессией)."""
+    pile_repo = SQLAlchemyCoalPileRepository(session)
+    temp_repo = SQLAlchemyTemperatureRepository(session)
+    fire_repo = SQLAlchemyFireIncidentRepository(session, pile_repo)
+    weather_repo = SQLAlchemyWeatherRepository(session)
+    return UploadDataService(
+        temperature_repo=temp_repo,
+        fire_repo=fire_repo,
+        pile_repo=pile_repo,
+        weather_repo=weather_repo,
+        feature_refresher=RefreshPileFeatures(
+            pile_repo=pile_repo,
+            temp_repo=temp_repo,
+            fire_repo=fire_repo,
+            weather_repo=weather_repo,
+            feature_repo=SQLAlchemyPileFeatureRepository(session),
+        ),
+        batch_size=settings.INGEST_BATCH_SIZE,
+        parse_workers=settings.PARSE_WORKERS,
+        parallel_parse_min_bytes=settings.PARALLEL_PARSE_MIN_BYTES,
+        parse_chunk_bytes=settings.PARSE_CHUNK_BYTES,
+        max_error_samples=settings.INGEST_ERROR_SAMPLES,
+        unit_of_work=SQLAlchemyUnitOfWork(session),
+    )
+
+
+def run_data_upload(
+    job: Job,
+    path: str,
+    data_type: str,
+    file_format: str = "csv",
+    compression: Optional[str] = None,
+) -> dict:
+    """
+    Фоновая загрузка файла или zip-архива из спула. Прогресс (счётчики строк
+    и скорость) виден в статусе задачи; после загрузки ставится один пересчёт
+    прогноза. Файл спула удаляется в любом случае.
+    """
+    started = time.perf_counter()
+
+    def report(**counters) -> None:
+        elapsed = time.perf_counter() - started
+        job_queue.update_progress(
+            job.job_id,
+            **counters,
+            rows_per_second=round(counters["rows_parsed"] / elapsed, 1) if elapsed else None,
+        )
+
+    try:
+        with SessionLocal() as session:
+            service = build_upload_data_service(session)
+            if file_format == "zip":
+                ingest = service.upload_bundle(path, on_progress=report)
+            else:
+                ingest = service.upload_file(
+                    path, data_type, on_progress=report, file_format=file_format, compression=compression
+                )
+    finally:
+        os.remove(path)
+
+    stats = ingest.model_dump()
+    if stats["elapsed_seconds"]:
+        stats["rows_per_second"] = round(stats["rows_parsed"] / stats["elapsed_seconds"], 1)
+    stats["recompute_job_id"] = schedule_forecast_recompute(job_queue).job_id
+    return stats
+
+
+def schedule_data_upload(
+    queue: JobQueue,
+    path: str,
+    data_type: str,
+    file_format: str = "csv",
+    compression: Optional[str] = None,
+) -> Job:
+    return queue.submit(
+        "data_upload",
+        partial(
+            run_data_upload,
+            path=path,
+            data_type=data_type,
+            file_format=file_format,
+            compression=compression,
+        ),
+    )
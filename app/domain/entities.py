@@ -1,5 +1,6 @@
-from datetime import date
-from typing import Optional, Dict, Any
+from datetime import date, datetime
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -57,7 +58,13 @@ class WeatherData(BaseModel):
     date: date
     air_temperature: float  # Средняя температура воздуха
     humidity: float  # Средняя влажность (%)
-    # Остальные поля (wind, pressure и т.д.) не используются в модели
+    # Остальные суточные агрегаты в модели пока не используются
+    temp_min: Optional[float] = None
+    temp_max: Optional[float] = None
+    pressure: Optional[int] = None  # Среднее давление
+    wind_speed_avg: Optional[float] = None
+    wind_speed_max: Optional[float] = None
+    precipitation: Optional[float] = None  # Сумма осадков за день
 
 
 class RiskForecast(BaseModel):
@@ -91,3 +98,165 @@ class Prediction(BaseModel):
     risk_level: str  # "low", "medium", "high"
     probability: float
     model_version: str = "v1.0"
+
+
+# Порядок уровней риска: фильтр «не ниже уровня» и сортировка по риску
+RISK_RANKS: Dict[str, int] = {"low": 1, "medium": 2, "high": 3}
+
+
+class DashboardQuery(BaseModel):
+    """
+    Фильтры, сортировка и страница списка штабелей дашборда.
+    Риск штабеля — максимальный уровень за даты прогноза (без прогноза — "low").
+    """
+
+    warehouse_id: Optional[int] = None
+    coal_type: Optional[str] = None
+    min_risk: Optional[str] = None  # "low" | "medium" | "high"
+    sort: str = "pile_id"  # pile_id | last_temp | risk | formation_date; "-" в начале — по убыванию
+    limit: Optional[int] = None
+    # Ключ последней строки предыдущей страницы: (значение поля сортировки, pile_id)
+    after: Optional[Tuple[Any, int]] = None
+
+
+class DashboardPile(BaseModel):
+    """Строка списка штабелей главного экрана: штабель, последний замер и прогноз по датам."""
+
+    pile_id: int
+    warehouse_id: int
+    coal_type: str
+    formation_date: date
+    last_temp: float
+    risk_levels: Dict[date, str] = Field(default_factory=dict)  # Уровень риска по дате прогноза
+
+    def risk_rank(self, forecast_dates: List[date]) -> int:
+        """Ранг максимального уровня риска за даты (как при фильтрации и сортировке в БД)."""
+        return max((RISK_RANKS.get(self.risk_levels.get(d, "low"), 1) for d in forecast_dates), default=1)
+
+
+class PileFeatures(BaseModel):
+    """
+    Признаки штабеля на дату в формате Приложения A контракта с дата-сайентистом.
+    Хранятся в таблице `pile_features`.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    pile_id: int
+    date: date
+    warehouse_id: int
+    coal_type: str
+    pile_formation_date: date
+    initial_volume_tonnes: float
+    days_in_storage: int
+    temperature_p: float
+    temp_trend_7d: float
+    temp_avg_7d: float
+    temp_max_7d: float
+    days_since_last_fire: int
+    fire_history_count: int
+    weather_temp_avg: float
+    weather_humidity: float
+    season: int
+    month_sin: float
+    month_cos: float
+
+
+class IngestReport(BaseModel):
+    """
+    Итог загрузки файла: счётчики строк, отклонённые строки по типам ошибок
+    с первыми примерами и время по фазам (parse, write, refresh_features, ...).
+    """
+
+    data_type: str
+    rows_parsed: int = 0
+    rows_written: int = 0
+    rows_skipped: int = 0  # Уже были в БД без изменений
+    rows_rejected: int = 0
+    errors: Dict[str, int] = Field(default_factory=dict)
+    error_samples: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict)
+    phases: Dict[str, float] = Field(default_factory=dict)
+    elapsed_seconds: Optional[float] = None
+    parse_workers: Optional[int] = None
+    max_error_samples: int = Field(default=5, exclude=True)
+
+    def reject(
+        self, error_type: str, row: Optional[int], message: str, values: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Учитывает отклонённую строку; хранятся только первые max_error_samples примеров."""
+        self.rows_rejected += 1
+        self.errors[error_type] = self.errors.get(error_type, 0) + 1
+        samples = self.error_samples.setdefault(error_type, [])
+        if len(samples) < self.max_error_samples:
+            samples.append({"row": row, "error": message, "values": values})
+
+    def reject_many(
+        self, error_type: str, count: int, message: str, samples: Iterable[Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """
+        Учитывает count отклонённых строк одним шагом (векторная валидация);
+        из samples (номер строки, значения) берутся только недостающие примеры.
+        """
+        if not count:
+            return
+        self.rows_rejected += count
+        self.errors[error_type] = self.errors.get(error_type, 0) + count
+        stored = self.error_samples.setdefault(error_type, [])
+        for row, values in islice(samples, max(self.max_error_samples - len(stored), 0)):
+            stored.append({"row": row, "error": message, "values": values})
+
+    def merge(self, other: "IngestReport", row_offset: int = 0) -> None:
+        """
+        Добавляет счётчики разбора и ошибки отчёта по части файла;
+        номера строк в примерах сдвигаются на row_offset.
+        """
+        self.rows_parsed += other.rows_parsed
+        self.rows_rejected += other.rows_rejected
+        for error_type, count in other.errors.items():
+            self.errors[error_type] = self.errors.get(error_type, 0) + count
+        for error_type, other_samples in other.error_samples.items():
+            samples = self.error_samples.setdefault(error_type, [])
+            for sample in other_samples[: max(self.max_error_samples - len(samples), 0)]:
+                if sample["row"] is not None:
+                    sample = {**sample, "row": sample["row"] + row_offset}
+                samples.append(sample)
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class BundleReport(BaseModel):
+    """Итог загрузки архива: отчёты по файлам в порядке загрузки и общие счётчики."""
+
+    files: List[IngestReport] = Field(default_factory=list)
+    rows_parsed: int = 0
+    rows_written: int = 0
+    rows_skipped: int = 0
+    rows_rejected: int = 0
+    phases: Dict[str, float] = Field(default_factory=dict)
+    elapsed_seconds: Optional[float] = None
+
+    def add(self, report: IngestReport) -> None:
+        self.files.append(report)
+        self.rows_parsed += report.rows_parsed
+        self.rows_written += report.rows_written
+        self.rows_skipped += report.rows_skipped
+        self.rows_rejected += report.rows_rejected
+
+
+class Job(BaseModel):
+    """
+    Фоновая задача (например, пересчёт прогноза после загрузки данных).
+    Статусы: queued → running → succeeded | failed.
+    """
+
+    job_id: str
+    kind: str
+    status: str = "queued"
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    progress: Dict[str, Any] = Field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
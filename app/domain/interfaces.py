@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from datetime import date, datetime
 
 from app.domain.entities import (
     CoalPile,
@@ -9,6 +9,9 @@ from app.domain.entities import (
     WeatherData,
     RiskForecast,
     Prediction,
+    PileFeatures,
+    DashboardPile,
+    DashboardQuery,
 )
 
 
@@ -18,13 +21,35 @@ class CoalPileRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_active(self) -> List[CoalPile]:
+    def get_all_active(self, pile_ids: Optional[List[int]] = None) -> List[CoalPile]:
+        """Все штабели; если передан pile_ids — только указанные."""
         pass
 
     @abstractmethod
     def save(self, pile: CoalPile) -> None:
         pass
 
+    @abstractmethod
+    def save_batch(self, piles: List[CoalPile]) -> int:
+        """
+        Сохраняет поставки одной транзакцией, пропуская уже загруженные.
+        Возвращает число вставленных строк.
+        """
+        pass
+
+    @abstractmethod
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+        То же, что save_batch, для уже проверенных колонок (имена — поля CoalPile,
+        например кадр pandas): записи пишутся без создания объекта на каждую строку.
+        """
+        pass
+
+    @abstractmethod
+    def get_last_loaded_at_by_pile_ids(self, pile_ids: List[int]) -> Dict[int, datetime]:
+        """Время последней загрузки поставок по каждому штабелю."""
+        pass
+
 
 class TemperatureRepository(ABC):
     @abstractmethod
@@ -38,7 +63,37 @@ class TemperatureRepository(ABC):
         pass
 
     @abstractmethod
-    def save_batch(self, readings: List[TemperatureReading]) -> None:
+    def get_latest_measurement_date(self) -> Optional[date]:
+        """Дата самого свежего замера температуры в системе."""
+        pass
+
+    @abstractmethod
+    def get_latest_by_pile_ids(
+        self, pile_ids: List[int], as_of: Optional[date] = None
+    ) -> Dict[int, TemperatureReading]:
+        """Последний замер по каждому штабелю одним запросом (не позже as_of, если задано)."""
+        pass
+
+    @abstractmethod
+    def get_by_pile_ids_and_date_range(
+        self, pile_ids: List[int], start_date: date, end_date: date
+    ) -> Dict[int, List[TemperatureReading]]:
+        """Замеры за период, сгруппированные по штабелям (по возрастанию даты)."""
+        pass
+
+    @abstractmethod
+    def get_last_loaded_at_by_pile_ids(self, pile_ids: List[int]) -> Dict[int, datetime]:
+        """Время последней загрузки замеров по каждому штабелю."""
+        pass
+
+    @abstractmethod
+    def save_batch(self, readings: List[TemperatureReading]) -> int:
+        """Upsert по естественному ключу, возвращает число вставленных и изменённых строк."""
+        pass
+
+    @abstractmethod
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """save_batch для проверенных колонок с именами полей TemperatureReading (picket и shift необязательны)."""
         pass
 
 
@@ -56,7 +111,18 @@ class FireIncidentRepository(ABC):
         pass
 
     @abstractmethod
-    def save_batch(self, incidents: List[FireIncident]) -> None:
+    def get_last_loaded_at(self) -> Optional[datetime]:
+        """Время последней загрузки пожаров (история пожаров влияет на все штабели)."""
+        pass
+
+    @abstractmethod
+    def save_batch(self, incidents: List[FireIncident]) -> int:
+        """Upsert по естественному ключу, возвращает число вставленных и изменённых строк."""
+        pass
+
+    @abstractmethod
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """save_batch для проверенных колонок с именами полей FireIncident."""
         pass
 
 
@@ -66,7 +132,17 @@ class WeatherRepository(ABC):
         pass
 
     @abstractmethod
-    def save_batch(self, weathers: List[WeatherData]) -> None:
+    def get_by_date_range(self, start: date, end: date) -> List[WeatherData]:
+        pass
+
+    @abstractmethod
+    def get_loaded_at(self, date: date) -> Optional[datetime]:
+        """Время загрузки погоды за дату."""
+        pass
+
+    @abstractmethod
+    def save_batch(self, weathers: List[WeatherData]) -> int:
+        """Upsert по естественному ключу, возвращает число вставленных и изменённых строк."""
         pass
 
 
@@ -78,7 +154,25 @@ class PredictionRepository(ABC):
         pass
 
     @abstractmethod
-    def save_batch(self, predictions: List[Prediction]) -> None:
+    def get_by_prediction_date(
+        self,
+        prediction_date: date,
+        model_version: str,
+        pile_ids: Optional[List[int]] = None,
+    ) -> List[Prediction]:
+        """Сохранённые прогнозы, рассчитанные на дату prediction_date указанной версией модели."""
+        pass
+
+    @abstractmethod
+    def get_created_at_by_pile_ids(
+        self, prediction_date: date, model_version: str, pile_ids: List[int]
+    ) -> Dict[int, datetime]:
+        """Когда был записан прогноз на дату по каждому штабелю."""
+        pass
+
+    @abstractmethod
+    def save_batch(self, predictions: List[Prediction]) -> int:
+        """Сохраняет прогнозы одной транзакцией, возвращает число записанных строк."""
         pass
 
     @abstractmethod
@@ -92,11 +186,69 @@ class PredictionRepository(ABC):
         pass
 
 
+class PileFeatureRepository(ABC):
+    @abstractmethod
+    def get_by_date(
+        self, date: date, pile_ids: Optional[List[int]] = None
+    ) -> List[PileFeatures]:
+        pass
+
+    @abstractmethod
+    def save_batch(self, features: List[PileFeatures]) -> int:
+        """Upsert по (pile_id, date), возвращает число записанных строк."""
+        pass
+
+
+class DashboardReadModel(ABC):
+    """Чтение данных главного экрана фиксированным числом запросов, независимо от числа штабелей."""
+
+    @abstractmethod
+    def get_piles(
+        self, forecast_dates: List[date], query: Optional[DashboardQuery] = None
+    ) -> List[DashboardPile]:
+        """
+        Активные штабели с последней температурой и уровнями риска на forecast_dates
+        (по самому свежему прогнозу на каждую дату). Штабели без замеров не возвращаются.
+        Фильтры, сортировка и страница query (limit, keyset after) применяются в БД.
+        """
+        pass
+
+    @abstractmethod
+    def get_last_fire_date(self) -> Optional[date]:
+        """Дата последнего возгорания во всей БД."""
+        pass
+
+
+class UnitOfWork(ABC):
+    """
+    Единица работы: записи репозиториев внутри блока with фиксируются
+    одной транзакцией при выходе из него и откатываются целиком при ошибке.
+    """
+
+    @abstractmethod
+    def __enter__(self) -> "UnitOfWork":
+        pass
+
+    @abstractmethod
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
 class MLService(ABC):
+    model_version: str = "v1.0"
+
     @abstractmethod
     def predict_risk(self, pile_features: dict) -> dict:
         """
         Вызывает ML-модель.
         Возвращает словарь в формате из Приложения B контракта с дата-сайентистом.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def predict_risk_batch(self, features_list: List[dict]) -> List[Optional[dict]]:
+        """
+        Прогноз для списка штабелей одним вызовом модели.
+        Возвращает список той же длины; None — для штабелей с некорректными признаками.
+        """
+        pass
@@ -0,0 +1,62 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Any], ...], Hashable]
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """
+    LRU-кэш готовых ответов GET-эндпоинтов в памяти процесса.
+    Ключ — эндпоинт, параметры и версия данных. Версию отдаёт version_source
+    (время последней записи в БД), поэтому её видят все воркеры, а запись
+    из любого источника делает старые ответы ненаходимыми. Ответ, во время
+    сборки которого версия сменилась, отдаётся, но не сохраняется.
+    """
+
+    def __init__(self, version_source: Callable[[], Hashable], max_entries: int = 256):
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._max_entries = max_entries
+        self._version_source = version_source
+        self._version: Hashable = None
+        self._lock = threading.Lock()
+
+    def current_version(self) -> Hashable:
+        """Версия данных из источника; при её смене сохранённые ответы выбрасываются."""
+        version = self._version_source()
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+        return version
+
+    def make_key(self, endpoint: str, params: Dict[str, Hashable]) -> CacheKey:
+        """Ключ по текущей версии данных; берётся до сборки ответа."""
+        return endpoint, tuple(sorted(params.items())), self.current_version()
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: CacheKey, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+        if self._max_entries <= 0 or key[2] != self.current_version():
+            return entry
+        with self._lock:
+            # Версия могла смениться и в другом потоке после проверки выше
+            if key[2] != self._version:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
@@ -0,0 +1,116 @@
+import csv
+from datetime import date, datetime
+from io import StringIO
+from typing import Any, Iterable, Sequence
+
+import pandas as pd
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+# Маркер NULL в потоке COPY: пустая строка без кавычек остаётся пустой строкой
+COPY_NULL = r"\N"
+
+
+def _to_copy_value(value: Any) -> Any:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def on_conflict_update(
+    table: Table,
+    conflict_target: str,
+    update_columns: Sequence[str],
+    touch_columns: Sequence[str] = ("loaded_at",),
+) -> str:
+    """
+    ON CONFLICT ... DO UPDATE, который переписывает строку только при изменении
+    значений update_columns. touch_columns (время загрузки) обновляются вместе
+    с ними, но сами по себе изменением не считаются.
+    """
+    assignments = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in (*update_columns, *touch_columns))
+    current = ", ".join(f'"{table.name}"."{c}"' for c in update_columns)
+    incoming = ", ".join(f'EXCLUDED."{c}"' for c in update_columns)
+    return (
+        f"ON CONFLICT {conflict_target} DO UPDATE SET {assignments} "
+        f"WHERE ROW({current}) IS DISTINCT FROM ROW({incoming})"
+    )
+
+
+class CopyBulkLoader:
+    """
+    Массовая загрузка строк в таблицу Postgres через COPY FROM STDIN.
+
+    Строки потоком пишутся во временную staging-таблицу той же структуры,
+    затем переносятся в целевую таблицу одним INSERT ... SELECT (с нужным
+    ON CONFLICT). Всё выполняется в текущей транзакции сессии — фиксирует
+    её вызывающий репозиторий.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def load(
+        self,
+        table: Table,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        on_conflict: str = "",
+    ) -> int:
+        """
+        Загружает строки (значения в порядке columns) в table.
+        Возвращает число строк, вставленных или обновлённых в целевой таблице.
+        """
+        buffer = StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        copied = 0
+        for row in rows:
+            writer.writerow([_to_copy_value(v) for v in row])
+            copied += 1
+        if not copied:
+            return 0
+        buffer.seek(0)
+        return self._copy(table, columns, buffer, on_conflict)
+
+    def load_frame(self, table: Table, frame: pd.DataFrame, on_conflict: str = "") -> int:
+        """
+        Загружает кадр, колонки которого названы как колонки table.
+        Поток COPY пишет pandas по колонкам целиком, объекты на каждую строку не создаются.
+        Даты (datetime64) пишутся как YYYY-MM-DD, пропуски — как NULL.
+        """
+        if frame.empty:
+            return 0
+        buffer = StringIO()
+        frame.to_csv(
+            buffer, header=False, index=False, na_rep=COPY_NULL, date_format="%Y-%m-%d", lineterminator="\n"
+        )
+        buffer.seek(0)
+        return self._copy(table, list(frame.columns), buffer, on_conflict)
+
+    def _copy(self, table: Table, columns: Sequence[str], buffer: StringIO, on_conflict: str) -> int:
+        staging = f"_staging_{table.name}"
+        column_list = ", ".join(f'"{c}"' for c in columns)
+
+        # Сырое соединение psycopg2 той же транзакции, что и у сессии
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.execute(f'DROP TABLE IF EXISTS pg_temp."{staging}"')
+            cursor.execute(
+                f'CREATE TEMP TABLE "{staging}" ON COMMIT DROP AS '
+                f'SELECT {column_list} FROM "{table.name}" WITH NO DATA'
+            )
+            cursor.copy_expert(
+                f"COPY \"{staging}\" ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
+            cursor.execute(
+                f'INSERT INTO "{table.name}" ({column_list}) '
+                f'SELECT {column_list} FROM "{staging}" {on_conflict}'
+            )
+            written = cursor.rowcount
+            cursor.execute(f'DROP TABLE "{staging}"')
+        finally:
+            cursor.close()
+        return written
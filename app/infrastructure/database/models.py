@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, Float, Index, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -10,7 +10,16 @@ class Base(DeclarativeBase):
 class Supply(Base):
     __tablename__ = "supplies"
     __table_args__ = (
-        Index("idx_supplies_composite", "warehouse_id", "pile_id", "unloading_date"),
+        # Естественный ключ поставки: повторная загрузка файла не создаёт дублей.
+        # В один день на штабель бывает несколько поставок разных марок и тоннажа
+        UniqueConstraint(
+            "warehouse_id", "pile_id", "unloading_date", "coal_type", "to_warehouse_ton",
+            name="uq_supplies_natural_key",
+        ),
+        # Первая поставка каждого штабеля (DISTINCT ON pile_id) читается по индексу
+        Index("idx_supplies_pile_date", "pile_id", "unloading_date"),
+        # Версия данных для кэша ответов (max loaded_at)
+        Index("idx_supplies_loaded_at", "loaded_at"),
     )
 
     supply_id = Column(Integer, primary_key=True, index=True)
@@ -27,7 +36,15 @@ class Supply(Base):
 class Fire(Base):
     __tablename__ = "fires"
     __table_args__ = (
-        Index("idx_fires_composite", "warehouse_id", "pile_id", "fire_start_date"),
+        # Естественный ключ акта о возгорании
+        UniqueConstraint(
+            "warehouse_id", "pile_id", "fire_start_date", "document_date",
+            name="uq_fires_natural_key",
+        ),
+        # Дата последнего пожара на дашборде
+        Index("idx_fires_fire_start_date", "fire_start_date"),
+        # Версия данных для кэша ответов (max loaded_at)
+        Index("idx_fires_loaded_at", "loaded_at"),
     )
 
     fire_id = Column(Integer, primary_key=True, index=True)
@@ -45,8 +62,18 @@ class Fire(Base):
 class Temperature(Base):
     __tablename__ = "temperatures"
     __table_args__ = (
-        Index("idx_temperatures_composite", "warehouse_id", "pile_id", "measurement_date"),
+        # Естественный ключ замера; пикет и смена могут быть пустыми
+        UniqueConstraint(
+            "warehouse_id", "pile_id", "measurement_date", "picket", "shift",
+            name="uq_temperatures_natural_key",
+            postgresql_nulls_not_distinct=True,
+        ),
         Index("idx_temperatures_temp", "temperature"),
+        Index("idx_temperatures_measurement_date", "measurement_date"),
+        # Последний замер по каждому штабелю (DISTINCT ON pile_id)
+        Index("idx_temperatures_pile_date", "pile_id", "measurement_date"),
+        # Версия данных для кэша ответов (max loaded_at)
+        Index("idx_temperatures_loaded_at", "loaded_at"),
     )
 
     temperature_id = Column(Integer, primary_key=True, index=True)
@@ -63,6 +90,8 @@ class Weather(Base):
     __tablename__ = "weather"
     __table_args__ = (
         Index("idx_weather_date", "date"),
+        # Версия данных для кэша ответов (max loaded_at)
+        Index("idx_weather_loaded_at", "loaded_at"),
     )
 
     weather_id = Column(Integer, primary_key=True, index=True)
@@ -82,7 +111,17 @@ class Weather(Base):
 class Prediction(Base):
     __tablename__ = "predictions"
     __table_args__ = (
-        Index("idx_predictions_composite", "warehouse_id", "pile_id", "prediction_date", "forecast_date"),
+        # Один прогноз на штабель, дату расчёта, целевую дату и версию модели
+        UniqueConstraint(
+            "warehouse_id", "pile_id", "prediction_date", "forecast_date", "model_version",
+            name="uq_predictions_forecast",
+        ),
+        # Чтение готового прогноза на дату (GET /predict без пересчёта)
+        Index("idx_predictions_prediction_date", "prediction_date", "model_version", "pile_id"),
+        # Прогнозы на даты дашборда
+        Index("idx_predictions_forecast_date", "forecast_date", "pile_id"),
+        # Версия данных для кэша ответов (max created_at)
+        Index("idx_predictions_created_at", "created_at"),
     )
 
     prediction_id = Column(Integer, primary_key=True, index=True)
@@ -92,5 +131,36 @@ class Prediction(Base):
     forecast_date = Column(Date, nullable=False)
     risk_level = Column(String(10), nullable=False)
     probability = Column(Numeric(5, 4), nullable=False)
-    model_version = Column(String(20), default="v1.0")
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    model_version = Column(String(20), nullable=False, default="v1.0", server_default="v1.0")
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class PileFeature(Base):
+    """Признаки штабеля на дату (Приложение A), поддерживаются при загрузке данных."""
+
+    __tablename__ = "pile_features"
+    __table_args__ = (
+        UniqueConstraint("pile_id", "date", name="uq_pile_features_pile_date"),
+        Index("idx_pile_features_date", "date"),
+    )
+
+    pile_feature_id = Column(Integer, primary_key=True, index=True)
+    pile_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    warehouse_id = Column(Integer, nullable=False)
+    coal_type = Column(String(50), nullable=False)
+    pile_formation_date = Column(Date, nullable=False)
+    initial_volume_tonnes = Column(Float, nullable=False)
+    days_in_storage = Column(Integer, nullable=False)
+    temperature_p = Column(Float, nullable=False)
+    temp_trend_7d = Column(Float, nullable=False)
+    temp_avg_7d = Column(Float, nullable=False)
+    temp_max_7d = Column(Float, nullable=False)
+    days_since_last_fire = Column(Integer, nullable=False)
+    fire_history_count = Column(Integer, nullable=False)
+    weather_temp_avg = Column(Float, nullable=False)
+    weather_humidity = Column(Float, nullable=False)
+    season = Column(Integer, nullable=False)
+    month_sin = Column(Float, nullable=False)
+    month_cos = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
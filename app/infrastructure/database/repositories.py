@@ -1,9 +1,12 @@
 from __future__ import annotations
-from datetime import date
-from typing import List, Optional
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
+import pandas as pd
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import case, func, literal, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.domain.entities import (
@@ -12,6 +15,10 @@ from app.domain.entities import (
     FireIncident,
     WeatherData,
     Prediction,
+    PileFeatures,
+    DashboardPile,
+    DashboardQuery,
+    RISK_RANKS,
 )
 from app.domain.interfaces import (
     CoalPileRepository,
@@ -19,15 +26,49 @@ from app.domain.interfaces import (
     FireIncidentRepository,
     WeatherRepository,
     PredictionRepository,
+    PileFeatureRepository,
+    DashboardReadModel,
+    UnitOfWork,
 )
+from app.infrastructure.database.bulk_loader import CopyBulkLoader, on_conflict_update
 from app.infrastructure.database.models import (
     Supply as SupplyModel,
     Temperature as TemperatureModel,
     Fire as FireModel,
     Weather as WeatherModel,
     Prediction as PredictionModel,
+    PileFeature as PileFeatureModel,
 )
 
+# Флаг в session.info: сессия внутри единицы работы, фиксирует её SQLAlchemyUnitOfWork
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+def _commit(session: Session) -> None:
+    """Фиксирует запись репозитория; внутри единицы работы — только отправляет её в БД."""
+    if session.info.get(UNIT_OF_WORK_KEY):
+        session.flush()
+    else:
+        session.commit()
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """Единица работы над сессией, общей для репозиториев загрузки."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def __enter__(self) -> "SQLAlchemyUnitOfWork":
+        self.session.info[UNIT_OF_WORK_KEY] = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.session.info.pop(UNIT_OF_WORK_KEY, None)
+        if exc_type is None:
+            self.session.commit()
+        else:
+            self.session.rollback()
+
 
 class SQLAlchemyCoalPileRepository(CoalPileRepository):
     def __init__(self, session: Session):
@@ -50,10 +91,12 @@ class SQLAlchemyCoalPileRepository(CoalPileRepository):
             warehouse_id=supply.warehouse_id,
         )
 
-    def get_all_active(self) -> List[CoalPile]:
+    def get_all_active(self, pile_ids: Optional[List[int]] = None) -> List[CoalPile]:
+        query = self.session.query(SupplyModel)
+        if pile_ids is not None:
+            query = query.filter(SupplyModel.pile_id.in_(pile_ids))
         supplies = (
-            self.session.query(SupplyModel)
-            .distinct(SupplyModel.pile_id)
+            query.distinct(SupplyModel.pile_id)
             .order_by(SupplyModel.pile_id, SupplyModel.unloading_date.asc())
             .all()
         )
@@ -80,6 +123,55 @@ class SQLAlchemyCoalPileRepository(CoalPileRepository):
         self.session.commit()
         self.session.refresh(db_obj)
 
+    def save_batch(self, piles: List[CoalPile]) -> int:
+        return self.save_columns(
+            {
+                "pile_id": [p.pile_id for p in piles],
+                "coal_type": [p.coal_type for p in piles],
+                "formation_date": [p.formation_date for p in piles],
+                "initial_volume_tonnes": [p.initial_volume_tonnes for p in piles],
+                "warehouse_id": [p.warehouse_id for p in piles],
+            }
+        )
+
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+        Сохраняет поставки одной транзакцией. Уже загруженные поставки
+        (по ключу uq_supplies_natural_key) пропускаются.
+        Возвращает число вставленных строк.
+        """
+        frame = pd.DataFrame(
+            {
+                "unloading_date": columns["formation_date"],
+                "coal_type": columns["coal_type"],
+                "pile_id": columns["pile_id"],
+                "warehouse_id": columns["warehouse_id"],
+                "to_warehouse_ton": columns["initial_volume_tonnes"],
+            }
+        )
+        frame["loaded_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            written = CopyBulkLoader(self.session).load_frame(
+                SupplyModel.__table__,
+                frame,
+                on_conflict="ON CONFLICT ON CONSTRAINT uq_supplies_natural_key DO NOTHING",
+            )
+            _commit(self.session)
+        except Exception:
+            self.session.rollback()
+            raise
+        return written
+
+    def get_last_loaded_at_by_pile_ids(self, pile_ids: List[int]) -> Dict[int, datetime]:
+        if not pile_ids:
+            return {}
+        stmt = (
+            select(SupplyModel.pile_id, func.max(SupplyModel.loaded_at))
+            .where(SupplyModel.pile_id.in_(pile_ids))
+            .group_by(SupplyModel.pile_id)
+        )
+        return {pile_id: loaded_at for pile_id, loaded_at in self.session.execute(stmt) if loaded_at}
+
 
 class SQLAlchemyTemperatureRepository(TemperatureRepository):
     def __init__(self, session: Session):
@@ -112,29 +204,111 @@ class SQLAlchemyTemperatureRepository(TemperatureRepository):
         models = result.scalars().all()
         return [TemperatureReading.model_validate(m) for m in models]
 
-    def save_batch(self, readings: List[TemperatureReading]) -> None:
+    def get_latest_measurement_date(self) -> Optional[date]:
+        stmt = select(func.max(TemperatureModel.measurement_date))
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def get_latest_by_pile_ids(
+        self, pile_ids: List[int], as_of: Optional[date] = None
+    ) -> Dict[int, TemperatureReading]:
+        if not pile_ids:
+            return {}
+        stmt = select(TemperatureModel).where(TemperatureModel.pile_id.in_(pile_ids))
+        if as_of is not None:
+            stmt = stmt.where(TemperatureModel.measurement_date <= as_of)
+        stmt = (
+            stmt.distinct(TemperatureModel.pile_id)
+            .order_by(TemperatureModel.pile_id, TemperatureModel.measurement_date.desc())
+        )
+        models = self.session.execute(stmt).scalars().all()
+        return {m.pile_id: TemperatureReading.model_validate(m) for m in models}
+
+    def get_by_pile_ids_and_date_range(
+        self, pile_ids: List[int], start_date: date, end_date: date
+    ) -> Dict[int, List[TemperatureReading]]:
+        if not pile_ids:
+            return {}
+        stmt = (
+            select(TemperatureModel)
+            .where(
+                TemperatureModel.pile_id.in_(pile_ids),
+                TemperatureModel.measurement_date >= start_date,
+                TemperatureModel.measurement_date <= end_date,
+            )
+            .order_by(
+                TemperatureModel.pile_id,
+                TemperatureModel.measurement_date.asc(),
+                TemperatureModel.temperature_id.asc(),
+            )
+        )
+        readings: Dict[int, List[TemperatureReading]] = defaultdict(list)
+        for m in self.session.execute(stmt).scalars():
+            readings[m.pile_id].append(TemperatureReading.model_validate(m))
+        return dict(readings)
+
+    def get_last_loaded_at_by_pile_ids(self, pile_ids: List[int]) -> Dict[int, datetime]:
+        if not pile_ids:
+            return {}
+        stmt = (
+            select(TemperatureModel.pile_id, func.max(TemperatureModel.loaded_at))
+            .where(TemperatureModel.pile_id.in_(pile_ids))
+            .group_by(TemperatureModel.pile_id)
+        )
+        return {pile_id: loaded_at for pile_id, loaded_at in self.session.execute(stmt) if loaded_at}
+
+    def save_batch(self, readings: List[TemperatureReading]) -> int:
+        return self.save_columns(
+            {
+                "pile_id": [r.pile_id for r in readings],
+                "warehouse_id": [r.warehouse_id for r in readings],
+                "measurement_date": [r.measurement_date for r in readings],
+                "temperature": [r.temperature for r in readings],
+                "picket": [r.picket for r in readings],
+                "shift": [r.shift for r in readings],
+            }
+        )
+
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+        Upsert замеров по ключу uq_temperatures_natural_key: новые вставляются,
+        изменившиеся обновляются, совпадающие с сохранёнными не пишутся.
+        Возвращает число вставленных и обновлённых строк.
+        """
+        frame = pd.DataFrame(
+            {
+                "measurement_date": columns["measurement_date"],
+                "warehouse_id": columns["warehouse_id"],
+                "pile_id": columns["pile_id"],
+                "temperature": columns["temperature"],
+                "picket": columns.get("picket"),
+                "shift": columns.get("shift"),
+            }
+        )
+        # Смена с пропусками приходит float-колонкой — в COPY она нужна целыми числами
+        frame["shift"] = frame["shift"].astype("Int64")
+        # В одном INSERT строка не может обновиться дважды — последняя запись побеждает
+        frame = frame.drop_duplicates(
+            ["warehouse_id", "pile_id", "measurement_date", "picket", "shift"], keep="last"
+        )
+        frame["loaded_at"] = datetime.now(timezone.utc).isoformat()
         try:
-            models = []
-            for r in readings:
-                logger.debug(f"[TEMP REPO] Преобразование в модель: {r}")
-                # Убедитесь, что coal_type НЕ используется
-                model = TemperatureModel(
-                    measurement_date=r.measurement_date,
-                    warehouse_id=r.warehouse_id,
-                    pile_id=r.pile_id,
-                    temperature=r.temperature,
-                    picket=r.picket,
-                    shift=r.shift,
-                    # coal_type НЕ передаём!
-                )
-                models.append(model)
-            self.session.add_all(models)
-            self.session.commit()
-            logger.info(f"[TEMP REPO] Успешно сохранено {len(models)} записей")
+            written = CopyBulkLoader(self.session).load_frame(
+                TemperatureModel.__table__,
+                frame,
+                on_conflict=on_conflict_update(
+                    TemperatureModel.__table__,
+                    "ON CONSTRAINT uq_temperatures_natural_key",
+                    ["temperature"],
+                ),
+            )
+            _commit(self.session)
+            logger.info(f"[TEMP REPO] Успешно сохранено {written} записей")
         except Exception as e:
             logger.exception(f"[TEMP REPO] Ошибка при сохранении: {e}")
             self.session.rollback()
             raise
+        return written
+
 
 class SQLAlchemyFireIncidentRepository(FireIncidentRepository):
     def __init__(
@@ -192,23 +366,61 @@ class SQLAlchemyFireIncidentRepository(FireIncidentRepository):
             for f in fires
         ]
 
-    def save_batch(self, incidents: List[FireIncident]) -> None:
-        models = []
-        for inc in incidents:
-            pile = self.coal_pile_repo.get_by_id(inc.pile_id)
-            coal_type = pile.coal_type if pile else "UNKNOWN"
-            model = FireModel(
-                document_date=inc.document_date,
-                coal_type=coal_type,
-                pile_id=inc.pile_id,
-                warehouse_id=inc.warehouse_id,
-                weight_act=inc.weight_act,
-                fire_start_date=inc.actual_date,
-            )
-            models.append(model)
+    def get_last_loaded_at(self) -> Optional[datetime]:
+        return self.session.execute(select(func.max(FireModel.loaded_at))).scalar_one_or_none()
 
-        self.session.add_all(models)
-        self.session.commit()
+    def save_batch(self, incidents: List[FireIncident]) -> int:
+        return self.save_columns(
+            {
+                "pile_id": [i.pile_id for i in incidents],
+                "warehouse_id": [i.warehouse_id for i in incidents],
+                "actual_date": [i.actual_date for i in incidents],
+                "document_date": [i.document_date for i in incidents],
+                "weight_act": [i.weight_act for i in incidents],
+            }
+        )
+
+    def save_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+        Upsert актов о возгорании по ключу uq_fires_natural_key.
+        Возвращает число вставленных и обновлённых строк.
+        """
+        frame = pd.DataFrame(
+            {
+                "document_date": columns["document_date"],
+                "pile_id": columns["pile_id"],
+                "warehouse_id": columns["warehouse_id"],
+                "weight_act": columns["weight_act"],
+                "fire_start_date": columns["actual_date"],
+            }
+        )
+        # В одном INSERT строка не может обновиться дважды — последняя запись побеждает
+        frame = frame.drop_duplicates(
+            ["warehouse_id", "pile_id", "fire_start_date", "document_date"], keep="last"
+        )
+        # Марки угля для всего пакета — одним запросом (первая поставка каждого штабеля)
+        coal_types = {
+            pile.pile_id: pile.coal_type
+            for pile in self.coal_pile_repo.get_all_active(pile_ids=frame["pile_id"].unique().tolist())
+        }
+        frame.insert(1, "coal_type", frame["pile_id"].map(coal_types).fillna("UNKNOWN"))
+        frame["loaded_at"] = datetime.now(timezone.utc).isoformat()
+
+        try:
+            written = CopyBulkLoader(self.session).load_frame(
+                FireModel.__table__,
+                frame,
+                on_conflict=on_conflict_update(
+                    FireModel.__table__,
+                    "ON CONSTRAINT uq_fires_natural_key",
+                    ["coal_type", "weight_act"],
+                ),
+            )
+            _commit(self.session)
+        except Exception:
+            self.session.rollback()
+            raise
+        return written
 
 
 class SQLAlchemyWeatherRepository(WeatherRepository):
@@ -221,17 +433,76 @@ class SQLAlchemyWeatherRepository(WeatherRepository):
         model = result.scalar_one_or_none()
         return WeatherData.model_validate(model) if model else None
 
-    def save_batch(self, weathers: List[WeatherData]) -> None:
-        models = [
-            WeatherModel(
-                date=w.date,
-                air_temperature=w.air_temperature,
-                humidity=w.humidity,
+    def get_by_date_range(self, start: date, end: date) -> List[WeatherData]:
+        stmt = (
+            select(WeatherModel)
+            .where(WeatherModel.date >= start, WeatherModel.date <= end)
+            .order_by(WeatherModel.date)
+        )
+        models = self.session.execute(stmt).scalars().all()
+        return [WeatherData.model_validate(m) for m in models]
+
+    def get_loaded_at(self, date: date) -> Optional[datetime]:
+        stmt = select(WeatherModel.loaded_at).where(WeatherModel.date == date)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def save_batch(self, weathers: List[WeatherData]) -> int:
+        """
+        Upsert суточной погоды по дате: изменившиеся дни перезаписываются,
+        совпадающие не пишутся. Возвращает число вставленных и обновлённых строк.
+        """
+        loaded_at = datetime.now(timezone.utc)
+        rows = {
+            w.date: (
+                w.date,
+                w.air_temperature,
+                w.temp_min,
+                w.temp_max,
+                w.humidity,
+                w.pressure,
+                w.wind_speed_avg,
+                w.wind_speed_max,
+                w.precipitation,
+                loaded_at,
             )
             for w in weathers
-        ]
-        self.session.add_all(models)
-        self.session.commit()
+        }
+        try:
+            written = CopyBulkLoader(self.session).load(
+                WeatherModel.__table__,
+                [
+                    "date",
+                    "air_temperature",
+                    "temp_min",
+                    "temp_max",
+                    "humidity",
+                    "pressure",
+                    "wind_speed_avg",
+                    "wind_speed_max",
+                    "precipitation",
+                    "loaded_at",
+                ],
+                rows.values(),
+                on_conflict=on_conflict_update(
+                    WeatherModel.__table__,
+                    "(date)",
+                    [
+                        "air_temperature",
+                        "temp_min",
+                        "temp_max",
+                        "humidity",
+                        "pressure",
+                        "wind_speed_avg",
+                        "wind_speed_max",
+                        "precipitation",
+                    ],
+                ),
+            )
+            _commit(self.session)
+        except Exception:
+            self.session.rollback()
+            raise
+        return written
 
 
 class SQLAlchemyPredictionRepository(PredictionRepository):
@@ -249,21 +520,76 @@ class SQLAlchemyPredictionRepository(PredictionRepository):
         models = result.scalars().all()
         return [Prediction.model_validate(m) for m in models]
 
-    def save_batch(self, predictions: List[Prediction]) -> None:
-        models = [
-            PredictionModel(
-                warehouse_id=p.warehouse_id,
-                pile_id=p.pile_id,
-                prediction_date=p.prediction_date,
-                forecast_date=p.forecast_date,
-                risk_level=p.risk_level,
-                probability=p.probability,
-                model_version=p.model_version,
+    def get_by_prediction_date(
+        self,
+        prediction_date: date,
+        model_version: str,
+        pile_ids: Optional[List[int]] = None,
+    ) -> List[Prediction]:
+        stmt = select(PredictionModel).where(
+            PredictionModel.prediction_date == prediction_date,
+            PredictionModel.model_version == model_version,
+        )
+        if pile_ids is not None:
+            stmt = stmt.where(PredictionModel.pile_id.in_(pile_ids))
+        stmt = stmt.order_by(PredictionModel.pile_id, PredictionModel.forecast_date)
+        models = self.session.execute(stmt).scalars().all()
+        return [Prediction.model_validate(m) for m in models]
+
+    def get_created_at_by_pile_ids(
+        self, prediction_date: date, model_version: str, pile_ids: List[int]
+    ) -> Dict[int, datetime]:
+        if not pile_ids:
+            return {}
+        stmt = (
+            select(PredictionModel.pile_id, func.min(PredictionModel.created_at))
+            .where(
+                PredictionModel.prediction_date == prediction_date,
+                PredictionModel.model_version == model_version,
+                PredictionModel.pile_id.in_(pile_ids),
             )
+            .group_by(PredictionModel.pile_id)
+        )
+        return {pile_id: created_at for pile_id, created_at in self.session.execute(stmt) if created_at}
+
+    def save_batch(self, predictions: List[Prediction]) -> int:
+        """
+        Сохраняет прогнозы одним многострочным INSERT ... ON CONFLICT DO UPDATE
+        в одной транзакции. Повторный расчёт на ту же дату перезаписывает прогноз,
+        а не добавляет новые строки. При ошибке транзакция откатывается целиком.
+        """
+        if not predictions:
+            return 0
+        # Ключ uq_predictions_forecast: в одном INSERT строка не может обновиться дважды
+        rows = {
+            (p.warehouse_id, p.pile_id, p.prediction_date, p.forecast_date, p.model_version): {
+                "warehouse_id": p.warehouse_id,
+                "pile_id": p.pile_id,
+                "prediction_date": p.prediction_date,
+                "forecast_date": p.forecast_date,
+                "risk_level": p.risk_level,
+                "probability": p.probability,
+                "model_version": p.model_version,
+            }
             for p in predictions
-        ]
-        self.session.add_all(models)
-        self.session.commit()
+        }
+        stmt = pg_insert(PredictionModel)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_predictions_forecast",
+            set_={
+                "risk_level": stmt.excluded.risk_level,
+                "probability": stmt.excluded.probability,
+                # Время записи берётся тем же способом, что и loaded_at у исходных данных
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        try:
+            self.session.execute(stmt, list(rows.values()))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(rows)
 
     def get_all_by_pile_id(self, pile_id: int) -> List[Prediction]:
         stmt = select(PredictionModel).where(PredictionModel.pile_id == pile_id)
@@ -292,4 +618,183 @@ class SQLAlchemyPredictionRepository(PredictionRepository):
             stmt = stmt.where(PredictionModel.forecast_date <= end_date)
         result = self.session.execute(stmt)
         models = result.scalars().all()
-        return [Prediction.model_validate(m) for m in models]
\ No newline at end of file
+        return [Prediction.model_validate(m) for m in models]
+
+
+class SQLAlchemyPileFeatureRepository(PileFeatureRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_date(
+        self, date: date, pile_ids: Optional[List[int]] = None
+    ) -> List[PileFeatures]:
+        stmt = select(PileFeatureModel).where(PileFeatureModel.date == date)
+        if pile_ids is not None:
+            stmt = stmt.where(PileFeatureModel.pile_id.in_(pile_ids))
+        stmt = stmt.order_by(PileFeatureModel.pile_id)
+        models = self.session.execute(stmt).scalars().all()
+        return [PileFeatures.model_validate(m) for m in models]
+
+    def save_batch(self, features: List[PileFeatures]) -> int:
+        if not features:
+            return 0
+        rows = {(f.pile_id, f.date): f.model_dump() for f in features}
+        stmt = pg_insert(PileFeatureModel)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_pile_features_pile_date",
+            set_={
+                column: stmt.excluded[column]
+                for column in PileFeatures.model_fields
+                if column not in ("pile_id", "date")
+            }
+            | {"updated_at": stmt.excluded.updated_at},
+        )
+        try:
+            self.session.execute(stmt, list(rows.values()))
+            _commit(self.session)
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(rows)
+
+
+class SQLAlchemyDashboardReadModel(DashboardReadModel):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_piles(
+        self, forecast_dates: List[date], query: Optional[DashboardQuery] = None
+    ) -> List[DashboardPile]:
+        query = query or DashboardQuery()
+        # Штабель — по первой поставке, как в SQLAlchemyCoalPileRepository.get_all_active
+        piles = (
+            select(
+                SupplyModel.pile_id,
+                SupplyModel.warehouse_id,
+                SupplyModel.coal_type,
+                SupplyModel.unloading_date,
+            )
+            .distinct(SupplyModel.pile_id)
+            .order_by(SupplyModel.pile_id, SupplyModel.unloading_date.asc())
+            .subquery("piles")
+        )
+        # Последний замер — по индексу (pile_id, measurement_date) для каждого штабеля
+        latest_temp = (
+            select(TemperatureModel.temperature)
+            .where(TemperatureModel.pile_id == piles.c.pile_id)
+            .order_by(TemperatureModel.measurement_date.desc())
+            .limit(1)
+            .lateral("latest_temp")
+        )
+        stmt = select(piles, latest_temp.c.temperature).join(latest_temp, true())
+
+        # Склад и марка — атрибуты первой поставки, поэтому фильтруются после DISTINCT ON
+        if query.warehouse_id is not None:
+            stmt = stmt.where(piles.c.warehouse_id == query.warehouse_id)
+        if query.coal_type is not None:
+            stmt = stmt.where(piles.c.coal_type == query.coal_type)
+
+        sort_field = query.sort.lstrip("-")
+        if query.min_risk is not None or sort_field == "risk":
+            risk = self._risk_ranks(forecast_dates).subquery("risk")
+            stmt = stmt.outerjoin(risk, risk.c.pile_id == piles.c.pile_id)
+            risk_rank = func.coalesce(risk.c.risk_rank, RISK_RANKS["low"])
+            if query.min_risk is not None:
+                stmt = stmt.where(risk_rank >= RISK_RANKS[query.min_risk])
+
+        sort_column = {
+            "pile_id": piles.c.pile_id,
+            "last_temp": latest_temp.c.temperature,
+            "formation_date": piles.c.unloading_date,
+        }.get(sort_field)
+        if sort_field == "risk":
+            sort_column = risk_rank
+        if sort_column is None:
+            raise ValueError(f"Неизвестное поле сортировки: {query.sort}")
+
+        # Keyset-пагинация: сравнение пары (поле сортировки, pile_id) с ключом последней строки
+        descending = query.sort.startswith("-")
+        sort_key = tuple_(sort_column, piles.c.pile_id)
+        if query.after is not None:
+            after = tuple_(*(literal(value) for value in query.after))
+            stmt = stmt.where(sort_key < after if descending else sort_key > after)
+        if descending:
+            stmt = stmt.order_by(sort_column.desc(), piles.c.pile_id.desc())
+        else:
+            stmt = stmt.order_by(sort_column, piles.c.pile_id)
+        if query.limit is not None:
+            stmt = stmt.limit(query.limit)
+
+        rows = self.session.execute(stmt).all()
+        risk_levels = self._get_risk_levels(forecast_dates, [row.pile_id for row in rows])
+        return [
+            DashboardPile(
+                pile_id=row.pile_id,
+                warehouse_id=row.warehouse_id,
+                coal_type=row.coal_type,
+                formation_date=row.unloading_date,
+                last_temp=float(row.temperature),
+                risk_levels=risk_levels.get(row.pile_id, {}),
+            )
+            for row in rows
+        ]
+
+    def _latest_predictions(self, forecast_dates: List[date]):
+        """Самый свежий прогноз на каждую пару (штабель, дата прогноза)."""
+        return (
+            select(PredictionModel.pile_id, PredictionModel.forecast_date, PredictionModel.risk_level)
+            .where(PredictionModel.forecast_date.in_(forecast_dates))
+            .distinct(PredictionModel.pile_id, PredictionModel.forecast_date)
+            .order_by(
+                PredictionModel.pile_id,
+                PredictionModel.forecast_date,
+                PredictionModel.prediction_date.desc(),
+                PredictionModel.created_at.desc(),
+            )
+        )
+
+    def _risk_ranks(self, forecast_dates: List[date]):
+        """Ранг максимального уровня риска штабеля за даты прогноза."""
+        latest = self._latest_predictions(forecast_dates).subquery("latest_predictions")
+        rank = case(RISK_RANKS, value=latest.c.risk_level, else_=RISK_RANKS["low"])
+        return select(latest.c.pile_id, func.max(rank).label("risk_rank")).group_by(latest.c.pile_id)
+
+    def _get_risk_levels(
+        self, forecast_dates: List[date], pile_ids: List[int]
+    ) -> Dict[int, Dict[date, str]]:
+        """Уровень риска по штабелю и дате — из самого свежего расчёта на эту дату."""
+        if not pile_ids:
+            return {}
+        stmt = self._latest_predictions(forecast_dates).where(PredictionModel.pile_id.in_(pile_ids))
+        risk_levels: Dict[int, Dict[date, str]] = defaultdict(dict)
+        for pile_id, forecast_date, risk_level in self.session.execute(stmt):
+            risk_levels[pile_id][forecast_date] = risk_level
+        return risk_levels
+
+    def get_last_fire_date(self) -> Optional[date]:
+        return self.session.execute(select(func.max(FireModel.fire_start_date))).scalar_one_or_none()
+
+
+class SQLAlchemyDataVersion:
+    """
+    Версия данных для кэша ответов: время последней записи в каждую таблицу
+    (loaded_at исходных данных, created_at прогнозов). Upsert переписывает эти
+    колонки при каждом изменении строки, поэтому версия меняется после любой
+    записи — из API, фоновой задачи, scripts/ или другого воркера.
+    Каждый максимум читается по индексу.
+    """
+
+    WRITE_TIMESTAMPS = (
+        SupplyModel.loaded_at,
+        TemperatureModel.loaded_at,
+        FireModel.loaded_at,
+        WeatherModel.loaded_at,
+        PredictionModel.created_at,
+    )
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self) -> Tuple[Optional[datetime], ...]:
+        stmt = select(*(select(func.max(column)).scalar_subquery() for column in self.WRITE_TIMESTAMPS))
+        return tuple(self.session.execute(stmt).one())
@@ -0,0 +1,125 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.domain.entities import Job
+
+JobFunc = Callable[[Job], Optional[Dict[str, Any]]]
+
+
+class JobQueue:
+    """
+    Очередь фоновых задач на пуле потоков.
+    Хранит статусы последних задач в памяти процесса.
+    """
+
+    def __init__(self, max_workers: int = 1, history_size: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._timers: Dict[str, threading.Timer] = {}
+        self._history_size = history_size
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        func: JobFunc,
+        coalesce: bool = False,
+        delay: float = 0.0,
+    ) -> Job:
+        """
+        Ставит задачу в очередь.
+        coalesce=True — если задача того же типа ещё ждёт запуска, новая не создаётся,
+        возвращается ожидающая. delay — пауза перед запуском, за которую успевают
+        объединиться несколько запросов подряд.
+        """
+        with self._lock:
+            if coalesce:
+                for job in self._jobs.values():
+                    if job.kind == kind and job.status == "queued":
+                        logger.debug(f"[JOBS] {kind}: объединено с ожидающей задачей {job.job_id}")
+                        return job.model_copy(deep=True)
+
+            job = Job(
+                job_id=uuid.uuid4().hex,
+                kind=kind,
+                created_at=datetime.now(timezone.utc),
+            )
+            self._jobs[job.job_id] = job
+            self._trim_history()
+
+            if delay > 0:
+                timer = threading.Timer(delay, self._start, args=(job.job_id, func))
+                timer.daemon = True
+                self._timers[job.job_id] = timer
+                timer.start()
+            else:
+                self._executor.submit(self._run, job.job_id, func)
+
+            logger.info(f"[JOBS] Задача {kind} {job.job_id} поставлена в очередь")
+            return job.model_copy(deep=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job else None
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return [job.model_copy(deep=True) for job in reversed(self._jobs.values())]
+
+    def update_progress(self, job_id: str, **progress: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.progress.update(progress)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, job_id: str, func: JobFunc) -> None:
+        with self._lock:
+            self._timers.pop(job_id, None)
+        self._executor.submit(self._run, job_id, func)
+
+    def _run(self, job_id: str, func: JobFunc) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+
+        try:
+            result = func(job)
+            status, error = "succeeded", None
+        except Exception as e:
+            logger.exception(f"[JOBS] Задача {job.kind} {job_id} завершилась ошибкой")
+            result, status, error = None, "failed", str(e)
+
+        with self._lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.now(timezone.utc)
+            job.duration_seconds = round(time.perf_counter() - started, 4)
+        logger.info(f"[JOBS] Задача {job.kind} {job_id}: {status} за {job.duration_seconds} с")
+
+    def _trim_history(self) -> None:
+        """Удаляет самые старые завершённые задачи сверх лимита истории."""
+        excess = len(self._jobs) - self._history_size
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.status in ("succeeded", "failed")][:excess]:
+            del self._jobs[job_id]
@@ -1,12 +1,13 @@
 import logging
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from app.domain.interfaces import MLService
 from app.core.config import settings
 
 try:
     from ml.predict import predict_risk as _predict_risk
+    from ml.predict import predict_risk_batch as _predict_risk_batch
 except ImportError as e:
     raise ImportError(
         "Не удалось загрузить ML-модуль. Убедитесь, что файл `ml/predict.py` существует "
@@ -24,6 +25,7 @@ class MLModelAdapter(MLService):
 
     def __init__(self, model_path: str | None = None):
         self.model_path = Path(model_path) if model_path else Path(settings.ML_MODEL_PATH)
+        self.model_version = settings.ML_MODEL_VERSION
         if not self.model_path.exists():
             logger.warning(f"Модель не найдена по пути: {self.model_path}")
         # Модель загрузится при первом вызове _predict_risk
@@ -39,4 +41,19 @@ class MLModelAdapter(MLService):
             return result
         except Exception as e:
             logger.error(f"Ошибка при вызове ML-модели: {e}")
-            raise ValueError(f"ML-модель вернула ошибку: {e}") from e
\ No newline at end of file
+            raise ValueError(f"ML-модель вернула ошибку: {e}") from e
+
+    def predict_risk_batch(
+        self, features_list: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Вызывает пакетный predict_risk_batch из ml/predict.py для всех штабелей сразу.
+        """
+        try:
+            results = _predict_risk_batch(features_list)
+            failed = sum(1 for r in results if r is None)
+            logger.debug(f"ML-прогноз получен для {len(results) - failed} штабелей, ошибок: {failed}")
+            return results
+        except Exception as e:
+            logger.error(f"Ошибка при пакетном вызове ML-модели: {e}")
+            raise ValueError(f"ML-модель вернула ошибку: {e}") from e
@@ -1,12 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.dependencies import job_queue
 from app.presentation.api.v1.router import router as v1_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Останавливаем фоновые задачи вместе с приложением
+    job_queue.shutdown()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="Coal Fire Predictor", version="0.1.0", debug=settings.debug)
+    app = FastAPI(title="Coal Fire Predictor", version="0.1.0", debug=settings.debug, lifespan=lifespan)
 
     # Настройка CORS
     app.add_middleware(
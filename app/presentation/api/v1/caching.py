@@ -0,0 +1,37 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.infrastructure.cache.response_cache import ResponseCache
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверка заголовка If-None-Match (список тегов или '*', слабые теги сравниваются по значению)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def cached_json_response(
+    request: Request,
+    cache: ResponseCache,
+    endpoint: str,
+    params: Dict[str, Hashable],
+    build: Callable[[], Any],
+) -> Response:
+    """
+    JSON-ответ из кэша по (эндпоинт, параметры, версия данных); build вызывается
+    только при промахе. Ответ несёт ETag, совпавший If-None-Match даёт 304 без тела.
+    """
+    key = cache.make_key(endpoint, params)
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache.put(key, JSONResponse(jsonable_encoder(build())).body)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -29,27 +29,31 @@
 #     }
 
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.application.use_cases.evaluate_model_quality import EvaluateModelQuality
 from app.core.dependencies import (
     get_prediction_repository,
     get_fire_incident_repository,
+    get_response_cache,
 )
+from app.presentation.api.v1.caching import cached_json_response
 
 router = APIRouter()
 
 
 @router.get("")
 def get_analytics(
+    request: Request,
     pred_repo=Depends(get_prediction_repository),
     fire_repo=Depends(get_fire_incident_repository),
+    cache=Depends(get_response_cache),
 ):
     try:
         use_case = EvaluateModelQuality(
             prediction_repo=pred_repo,
             fire_repo=fire_repo,
         )
-        return use_case.execute()
+        return cached_json_response(request, cache, "analytics", {}, use_case.execute)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -38,38 +38,56 @@
 #     }
 
 
-from fastapi import APIRouter, Depends, HTTPException
-from app.application.use_cases.get_dashboard_data import GetDashboardData
-from app.core.dependencies import (
-    get_coal_pile_repository,
-    get_temperature_repository,
-    get_prediction_repository,
-    get_fire_incident_repository,
-    get_weather_repository,
-)
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from app.core.dependencies import get_get_dashboard_data, get_response_cache
+from app.domain.entities import DashboardQuery
+from app.presentation.api.v1.caching import cached_json_response
 
 router = APIRouter()
 
+SortOrder = Literal[
+    "pile_id", "-pile_id", "last_temp", "-last_temp", "risk", "-risk", "formation_date", "-formation_date"
+]
+
 
 @router.get("")
 def get_dashboard(
-    pile_repo=Depends(get_coal_pile_repository),
-    temp_repo=Depends(get_temperature_repository),
-    pred_repo=Depends(get_prediction_repository),
-    fire_repo=Depends(get_fire_incident_repository),
-    weather_repo=Depends(get_weather_repository),
+    request: Request,
+    warehouse_id: Optional[int] = Query(None, description="Только штабели склада"),
+    coal_type: Optional[str] = Query(None, description="Только штабели марки угля"),
+    min_risk: Optional[Literal["low", "medium", "high"]] = Query(
+        None, description="Максимальный риск за 3 дня не ниже уровня"
+    ),
+    sort: SortOrder = Query("pile_id", description="Поле сортировки; '-' в начале — по убыванию"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Размер страницы; без него — все штабели"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    use_case=Depends(get_get_dashboard_data),
+    cache=Depends(get_response_cache),
 ):
+    """
+    Данные главного экрана. Фильтры, сортировка и страница списка штабелей
+    применяются в БД; следующая страница — по next_cursor из ответа.
+    """
+    query = DashboardQuery(
+        warehouse_id=warehouse_id, coal_type=coal_type, min_risk=min_risk, sort=sort, limit=limit
+    )
+    # Дата по умолчанию — сегодня, поэтому она входит в ключ кэша
+    forecast_date = date.today()
     try:
-        use_case = GetDashboardData(
-            pile_repo=pile_repo,
-            temp_repo=temp_repo,
-            pred_repo=pred_repo,
-            fire_repo=fire_repo,
-            weather_repo=weather_repo,
+        return cached_json_response(
+            request,
+            cache,
+            "dashboard",
+            {"forecast_date": forecast_date, "cursor": cursor, **query.model_dump()},
+            lambda: use_case.execute(forecast_date=forecast_date, query=query, cursor=cursor),
         )
-        return use_case.execute()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Ошибка при формировании дашборда: {str(e)}"
-        )
\ No newline at end of file
+        )
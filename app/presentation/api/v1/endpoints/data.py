@@ -1,63 +1,159 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from io import StringIO
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Response
 
 from loguru import logger
 
-from app.application.use_cases.upload_data import UploadDataService
+from app.application.use_cases.upload_data import (
+    UploadDataService,
+    detect_file_format,
+    missing_dependency,
+)
+from app.core.config import settings
 from app.core.dependencies import (
     get_coal_pile_repository,
     get_temperature_repository,
     get_fire_incident_repository,
     get_weather_repository,
-    # get_calculate_fire_risk,
+    get_refresh_pile_features,
+    get_unit_of_work,
+    get_job_queue,
+    schedule_forecast_recompute,
+    schedule_data_upload,
 )
 
 router = APIRouter()
 
 ALLOWED_DATA_TYPES = {"temperature", "fires", "supplies", "weather"}
+# Тип данных zip-архива: типы файлов внутри определяются по их именам
+BUNDLE_DATA_TYPE = "bundle"
+
+# Размер блока копирования загрузки в файл спула
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+CSV_CONTENT_TYPES = {"text/csv", "application/vnd.ms-excel"}
+# Формат и сжатие по MIME-типу, если расширение имени файла не распознано
+CONTENT_TYPE_FORMATS = {
+    "application/vnd.apache.parquet": ("parquet", None),
+    "application/x-parquet": ("parquet", None),
+    "application/vnd.apache.arrow.file": ("arrow", None),
+    "application/vnd.apache.arrow.stream": ("arrow", None),
+    "application/gzip": ("csv", "gzip"),
+    "application/x-gzip": ("csv", "gzip"),
+    "application/zstd": ("csv", "zstd"),
+    "application/zip": ("zip", None),
+    "application/x-zip-compressed": ("zip", None),
+}
 
 
-@router.post("")
+def detect_upload_format(file: UploadFile) -> Tuple[str, Optional[str]]:
+    """Формат загрузки ('csv', 'parquet', 'arrow', 'zip') и сжатие CSV ('gzip', 'zstd')."""
+    file_format, compression = detect_file_format(file.filename or "")
+    if file_format:
+        return file_format, compression
+    if compression is None and file.content_type in CONTENT_TYPE_FORMATS:
+        return CONTENT_TYPE_FORMATS[file.content_type]
+    if file.content_type in CSV_CONTENT_TYPES:
+        return "csv", None
+    raise HTTPException(
+        status_code=400,
+        detail="Файл должен быть в формате CSV (в т.ч. .gz, .zst), Parquet, Arrow или zip-архивом",
+    )
+
+
+@router.post("", status_code=202)
 def upload_data(
+    response: Response,
     file: UploadFile = File(...),
-    data_type: str = Form(...),
+    data_type: Optional[str] = Form(None),
+    wait: bool = Form(False),
     pile_repo=Depends(get_coal_pile_repository),
     temp_repo=Depends(get_temperature_repository),
     fire_repo=Depends(get_fire_incident_repository),
     weather_repo=Depends(get_weather_repository),
-    # calculate_service=Depends(get_calculate_fire_risk),
+    feature_refresher=Depends(get_refresh_pile_features),
+    unit_of_work=Depends(get_unit_of_work),
+    job_queue=Depends(get_job_queue),
 ):
-    if data_type not in ALLOWED_DATA_TYPES:
+    file_format, compression = detect_upload_format(file)
+    if file_format == "zip":
+        if data_type not in (None, BUNDLE_DATA_TYPE):
+            raise HTTPException(
+                status_code=400,
+                detail="Для zip-архива тип данных берётся из имён файлов — не указывайте data_type",
+            )
+        data_type = BUNDLE_DATA_TYPE
+    elif data_type not in ALLOWED_DATA_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"Недопустимый тип данных. Допустимые значения: {sorted(ALLOWED_DATA_TYPES)}"
         )
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel"):
-        raise HTTPException(status_code=400, detail="Файл должен быть в формате CSV")
+    missing = missing_dependency(file_format, compression)
+    if missing:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Формат файла не поддерживается: на сервере не установлен пакет {missing}",
+        )
 
-    try:
-        content = file.file.read().decode("utf-8")
-        file_like = StringIO(content)
+    if not wait:
+        # Файл сохраняется в спул, разбор и запись идут в фоновой задаче
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode="wb",
+                suffix=os.path.splitext(file.filename or "")[1] or f".{file_format}",
+                dir=settings.UPLOAD_SPOOL_DIR,
+                delete=False,
+            ) as spool:
+                shutil.copyfileobj(file.file, spool, SPOOL_CHUNK_BYTES)
+        except OSError as e:
+            logger.exception("Ошибка при сохранении загрузки в спул")
+            raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+
+        try:
+            job = schedule_data_upload(job_queue, spool.name, data_type, file_format, compression)
+        except Exception:
+            os.remove(spool.name)
+            raise
+        return {
+            "status": "accepted",
+            "message": f"Данные типа '{data_type}' приняты в обработку.",
+            "job_id": job.job_id,
+        }
 
+    try:
         service = UploadDataService(
             temperature_repo=temp_repo,
             fire_repo=fire_repo,
             pile_repo=pile_repo,
             weather_repo=weather_repo,
+            feature_refresher=feature_refresher,
+            batch_size=settings.INGEST_BATCH_SIZE,
+            max_error_samples=settings.INGEST_ERROR_SAMPLES,
+            unit_of_work=unit_of_work,
         )
-        service.upload_csv(file_like, data_type)
+        if file_format == "zip":
+            report = service.upload_bundle(file.file)
+        else:
+            # Поток читается и распаковывается по мере разбора, файл целиком в память не попадает
+            report = service.upload_source(file.file, data_type, file_format, compression)
 
-        # Автоматический пересчёт прогноза после загрузки
-        # calculate_service.execute()
+        # Автоматический пересчёт прогноза после загрузки — в фоне
+        job = schedule_forecast_recompute(job_queue)
 
+        response.status_code = 200
         return {
             "status": "success",
-            "message": f"Данные типа '{data_type}' приняты. Прогноз обновляется."
+            "message": f"Данные типа '{data_type}' приняты. Прогноз обновляется.",
+            "job_id": job.job_id,
+            "stats": report.model_dump(),
         }
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Ошибка в данных: {str(e)}")
     except Exception as e:
-        logger.exception("Ошибка при загрузке CSV")
-        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
\ No newline at end of file
+        logger.exception("Ошибка при загрузке данных")
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
@@ -0,0 +1,25 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+
+from app.core.dependencies import get_job_queue
+
+router = APIRouter()
+
+
+@router.get("")
+def list_jobs(job_queue=Depends(get_job_queue)) -> List[dict]:
+    """Последние фоновые задачи (сначала новые)."""
+    return [job.model_dump(mode="json") for job in job_queue.list()]
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: str = Path(..., description="ID фоновой задачи"),
+    job_queue=Depends(get_job_queue),
+) -> dict:
+    """Статус, прогресс и тайминги фоновой задачи."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задача {job_id} не найдена")
+    return job.model_dump(mode="json")
@@ -27,31 +27,45 @@
 #     }
 
 
-from fastapi import APIRouter, Path, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Path, Depends, HTTPException, Request
 from app.application.use_cases.get_pile_history import GetPileHistory
 from app.core.dependencies import (
     get_coal_pile_repository,
     get_temperature_repository,
     get_prediction_repository,
+    get_response_cache,
 )
+from app.presentation.api.v1.caching import cached_json_response
 
 router = APIRouter()
 
 
 @router.get("/{pile_id}/history")
 def get_pile_history(
+    request: Request,
     pile_id: int = Path(..., description="Уникальный ID штабеля"),
     pile_repo=Depends(get_coal_pile_repository),
     temp_repo=Depends(get_temperature_repository),
     pred_repo=Depends(get_prediction_repository),
+    cache=Depends(get_response_cache),
 ):
+    # days_in_storage считается от сегодняшней даты, поэтому она входит в ключ кэша
+    forecast_date = date.today()
     try:
         use_case = GetPileHistory(
             pile_repo=pile_repo,
             temp_repo=temp_repo,
             pred_repo=pred_repo,
         )
-        return use_case.execute(pile_id=pile_id)
+        return cached_json_response(
+            request,
+            cache,
+            "pile_history",
+            {"pile_id": pile_id, "forecast_date": forecast_date},
+            lambda: use_case.execute(pile_id=pile_id, forecast_date=forecast_date),
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -1,23 +1,36 @@
 from datetime import date as dt_date
 from typing import List, Optional, Union
 
-from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi import APIRouter, Query, Depends, HTTPException, Response
 from app.application.use_cases.calculate_fire_risk import CalculateFireRisk
-from app.core.dependencies import get_calculate_fire_risk
+from app.core.dependencies import (
+    get_calculate_fire_risk,
+    get_job_queue,
+    schedule_forecast_backfill,
+    schedule_forecast_recompute,
+)
 
 router = APIRouter()
 
 
 @router.get("")
 def get_prediction(
+    response: Response,
     pile_id: Optional[int] = Query(None),
     date: Optional[str] = Query(None, alias="forecast_date_str"),  # опционально можно оставить alias
+    refresh: bool = Query(False, description="Пересчитать прогноз, даже если он уже сохранён"),
     calculate_service: CalculateFireRisk = Depends(get_calculate_fire_risk),
+    job_queue=Depends(get_job_queue),
 ) -> Union[dict, List[dict]]:
     """
     Получение прогноза риска самовозгорания.
     Если параметр `date` не указан — дата определяется автоматически
     по последней доступной температуре в системе.
+    Отдаются прогнозы на эту дату текущей версией модели из таблицы predictions;
+    модель вызывается и прогноз записывается только при `refresh=true`.
+    Штабели без прогноза или с новыми данными досчитывает фоновый пересчёт
+    (для последней даты замеров) — до его завершения отдаётся сохранённый прогноз,
+    а для штабеля без прогноза — 202 с job_id пересчёта.
     """
     # Определяем forecast_date_for_use_case
     if date is not None:
@@ -32,16 +45,55 @@ def get_prediction(
         forecast_date_for_use_case = None  # ← КЛЮЧЕВОЕ: передаём None
 
     try:
-        forecasts = calculate_service.execute(forecast_date=forecast_date_for_use_case)
+        forecasts = calculate_service.get_forecasts(
+            forecast_date=forecast_date_for_use_case,
+            pile_ids=[pile_id] if pile_id is not None else None,
+            refresh=refresh,
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка при расчёте прогноза: {str(e)}")
 
+    # Чтение не пишет в БД: устаревшие и недостающие прогнозы досчитывает фоновая задача,
+    # серия запросов подряд даёт один запуск
+    recompute_job = None
+    if calculate_service.last_run_stats.get("recompute_needed"):
+        recompute_job = schedule_forecast_recompute(job_queue)
+
     if pile_id is not None:
         for f in forecasts:
             if f.pile_id == pile_id:
                 return f.model_dump()
+        if recompute_job is not None:
+            response.status_code = 202
+            return {
+                "status": "accepted",
+                "message": f"Прогноз для штабеля {pile_id} ещё не рассчитан, пересчёт поставлен в очередь.",
+                "job_id": recompute_job.job_id,
+            }
         raise HTTPException(status_code=404, detail=f"Прогноз для штабеля {pile_id} не найден.")
 
-    return [f.model_dump() for f in forecasts]
\ No newline at end of file
+    return [f.model_dump() for f in forecasts]
+
+
+@router.post("/backfill", status_code=202)
+def backfill_predictions(
+    start_date: dt_date = Query(..., description="Первая дата прогноза, YYYY-MM-DD"),
+    end_date: dt_date = Query(..., description="Последняя дата прогноза, YYYY-MM-DD"),
+    pile_id: Optional[List[int]] = Query(None, description="Ограничить расчёт штабелями"),
+    job_queue=Depends(get_job_queue),
+) -> dict:
+    """
+    Расчёт прогнозов задним числом за диапазон дат одним проходом.
+    Выполняется в фоне; статус — GET /api/v1/jobs/{job_id}.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Дата начала больше даты окончания")
+
+    job = schedule_forecast_backfill(job_queue, start_date, end_date, pile_ids=pile_id)
+    return {
+        "status": "accepted",
+        "message": f"Расчёт прогнозов за {start_date}..{end_date} поставлен в очередь.",
+        "job_id": job.job_id,
+    }
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .endpoints import analytics, dashboard, data, pile_history, predict
+from .endpoints import analytics, dashboard, data, jobs, pile_history, predict
 
 router = APIRouter(prefix="/api/v1")
 
@@ -9,3 +9,4 @@ router.include_router(predict.router, prefix="/predict", tags=["Prediction"])
 router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 router.include_router(pile_history.router, prefix="/pile", tags=["Pile History"])
+router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
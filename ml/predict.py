@@ -28,6 +28,15 @@ class CoalFirePredictor:
 
         return df_scaled
 
+    def _prepare_features_batch(self, features_list):
+        rows = [
+            [pile_features.get(feature, 0) for feature in self.feature_columns]
+            for pile_features in features_list
+        ]
+        df = pd.DataFrame(rows, columns=self.feature_columns)
+
+        return self.scaler.transform(df)
+
     def _map_risk_level(self, probability):
         if probability < 0.005: # 0.3
             return "low"
@@ -36,6 +45,25 @@ class CoalFirePredictor:
         else:
             return "high"
 
+    def _build_result(self, pile_features, probability):
+        probabilities = {
+            'day_1': min(probability * 1.0, 0.99),
+            'day_2': min(probability * 0.9, 0.99),
+            'day_3': min(probability * 0.8, 0.99)
+        }
+
+        risk_levels = {
+            day: self._map_risk_level(prob)
+            for day, prob in probabilities.items()
+        }
+
+        return {
+            "pile_id": pile_features.get('pile_id', 0),
+            "forecast_date": pile_features.get("forecast_date", datetime.now().strftime('%Y-%m-%d')),
+            "risk_levels": risk_levels,
+            "probabilities": probabilities
+        }
+
     def predict_risk(self, pile_features):
 
         try:
@@ -43,29 +71,39 @@ class CoalFirePredictor:
 
             probability = self.model.predict_proba(X)[0, 1]
 
-            probabilities = {
-                'day_1': min(probability * 1.0, 0.99),
-                'day_2': min(probability * 0.9, 0.99),
-                'day_3': min(probability * 0.8, 0.99)
-            }
-
-            risk_levels = {
-                day: self._map_risk_level(prob)
-                for day, prob in probabilities.items()
-            }
-
-            result = {
-                "pile_id": pile_features.get('pile_id', 0),
-                "forecast_date": pile_features.get("forecast_date", datetime.now().strftime('%Y-%m-%d')),
-                "risk_levels": risk_levels,
-                "probabilities": probabilities
-            }
-
-            return result
+            return self._build_result(pile_features, probability)
 
         except Exception as e:
             raise ValueError(f"Ошибка предсказания: {e}")
 
+    def predict_risk_batch(self, features_list):
+        """
+        Прогноз сразу для списка штабелей: одна матрица признаков,
+        один вызов scaler.transform и model.predict_proba.
+        Возвращает список той же длины; если признаки штабеля некорректны,
+        на его месте будет None, остальные штабели считаются как обычно.
+        """
+        if not features_list:
+            return []
+
+        try:
+            X = self._prepare_features_batch(features_list)
+            probabilities = self.model.predict_proba(X)[:, 1]
+        except Exception:
+            # Пакет не прошёл целиком — считаем по одному, отбрасывая только плохие строки
+            results = []
+            for pile_features in features_list:
+                try:
+                    results.append(self.predict_risk(pile_features))
+                except ValueError:
+                    results.append(None)
+            return results
+
+        return [
+            self._build_result(pile_features, probability)
+            for pile_features, probability in zip(features_list, probabilities)
+        ]
+
 
 _predictor = None
 
@@ -75,3 +113,10 @@ def predict_risk(pile_features):
     if _predictor is None:
         _predictor = CoalFirePredictor()
     return _predictor.predict_risk(pile_features)
+
+
+def predict_risk_batch(features_list):
+    global _predictor
+    if _predictor is None:
+        _predictor = CoalFirePredictor()
+    return _predictor.predict_risk_batch(features_list)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Расчёт прогнозов задним числом за диапазон дат.
+
+Пример:
+    poetry run python scripts/backfill_forecasts.py 2020-01-01 2020-12-31 --workers 4
+
+С --workers > 1 штабели делятся по складам, и каждый склад считается
+в отдельном процессе со своим подключением к БД и своей копией модели.
+"""
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.dependencies import SessionLocal, build_backfill_forecasts, engine  # noqa: E402
+from app.infrastructure.database.repositories import SQLAlchemyCoalPileRepository  # noqa: E402
+
+
+def _reset_engine() -> None:
+    """Дочерний процесс не должен использовать соединения, открытые родителем."""
+    engine.dispose(close=False)
+
+
+def backfill_piles(start_date: date, end_date: date, pile_ids: List[int]) -> dict:
+    with SessionLocal() as session:
+        return build_backfill_forecasts(session).execute(start_date, end_date, pile_ids=pile_ids)
+
+
+def piles_by_warehouse() -> Dict[int, List[int]]:
+    with SessionLocal() as session:
+        groups: Dict[int, List[int]] = {}
+        for pile in SQLAlchemyCoalPileRepository(session).get_all_active():
+            groups.setdefault(pile.warehouse_id, []).append(pile.pile_id)
+        return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Расчёт прогнозов за диапазон дат")
+    parser.add_argument("start_date", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("end_date", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов (по складам)")
+    args = parser.parse_args()
+
+    if args.start_date > args.end_date:
+        parser.error("start_date больше end_date")
+
+    if args.workers <= 1:
+        print(backfill_piles(args.start_date, args.end_date, pile_ids=None))
+        return
+
+    groups = piles_by_warehouse()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_reset_engine) as pool:
+        futures = {
+            warehouse_id: pool.submit(backfill_piles, args.start_date, args.end_date, pile_ids)
+            for warehouse_id, pile_ids in groups.items()
+        }
+        for warehouse_id, future in futures.items():
+            print(f"Склад {warehouse_id}: {future.result()}")
+
+
+if __name__ == "__main__":
+    main()